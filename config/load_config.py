@@ -1,25 +1,97 @@
 import os
+import functools
+import pickle
+import struct
 import yaml
 from pathlib import Path
 
+# LibYAML (C) parsea 5-10x más rápido que el loader puro de Python;
+# si el wheel de PyYAML no trae _yaml, se usa el SafeLoader normal.
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+_THIS_DIR = Path(__file__).resolve().parent
+_ENVPATHS_YAML = _THIS_DIR / "envpaths.yaml"
+
+# Cabecera del caché: mtime_ns + size del YAML original (16 bytes)
+_CACHE_HEADER = struct.Struct("<QQ")
+
+def _load_yaml_cached(path: Path):
+    """
+        Carga un archivo YAML usando un caché pickle en disco (sidecar ".cache").
+
+        El caché se invalida automáticamente cuando cambia el mtime o el tamaño
+        del YAML original, por lo que solo se paga el parseo de YAML la primera
+        vez (o tras una edición del archivo).
+
+        Args:
+        -----
+            path (Path): Ruta al archivo YAML.
+
+        Returns:
+        -----
+            Contenido parseado del YAML (dict / list).
+    """
+    st = os.stat(path)
+    header = _CACHE_HEADER.pack(st.st_mtime_ns, st.st_size)
+    cache_path = path.with_suffix(path.suffix + ".cache")
+
+    try:
+        with open(cache_path, "rb") as f:
+            if f.read(_CACHE_HEADER.size) == header:
+                return pickle.load(f)
+    except (OSError, pickle.PickleError, EOFError):
+        pass
+
+    with open(path, "r", encoding="utf-8") as f:
+        data = yaml.load(f, Loader=_YamlLoader)
+
+    # Escritura atómica del caché (header + payload) para evitar cachés a medias
+    tmp_path = cache_path.with_suffix(cache_path.suffix + ".tmp")
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(header)
+            f.write(pickle.dumps(data, protocol=5))
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+
+    return data
+
+@functools.lru_cache(maxsize=4)
+def _cargar_envars_impl(running_env: str, mtime_ns: int):
+    """
+        Parsea "envpaths.yaml" y devuelve el dict de rutas para el entorno dado.
+
+        Cacheado por (running_env, mtime_ns): re-entradas (tests, notebooks,
+        subcomandos) solo pagan un stat del archivo en vez de re-parsear.
+    """
+    data = _load_yaml_cached(_ENVPATHS_YAML)
+    return data.get("paths", {}).get(running_env)
+
+# Último dict aplicado a os.environ, para no re-escribir en llamadas repetidas
+_last_applied_envars = None
+
 def cargar_envars():
     """
-        Carga las rutas y las variables de entorno que se tenga en el archivo "envpaths.yaml" 
+        Carga las rutas y las variables de entorno que se tenga en el archivo "envpaths.yaml"
         como variables de entorno para la ejecución del pipeline.
 
         Returns:
         -----
-            Rutas marcadas como variables de entorno 
+            Rutas marcadas como variables de entorno
     """
-    config_path = Path(__file__).parent / "envpaths.yaml"
-    with open(config_path, "r", encoding="utf-8") as f:
-        data = yaml.safe_load(f)
+    global _last_applied_envars
 
     running_env = os.getenv("RUNNING_ENV", "local")
-    env_paths = data.get("paths", {}).get(running_env)
-    if env_paths:
+    env_paths = _cargar_envars_impl(running_env, os.stat(_ENVPATHS_YAML).st_mtime_ns)
+
+    if env_paths and env_paths is not _last_applied_envars:
         for key, path in env_paths.items():
-            os.environ[key] = str(path)  
+            os.environ[key] = str(path)
+        _last_applied_envars = env_paths
 
 def validate_file_path(path: str, extensions: tuple) -> str:
     """
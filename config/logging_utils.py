@@ -1,10 +1,16 @@
+import os
 import sys
+import atexit
+import queue
 import logging
+import logging.handlers
 from datetime import datetime
 from pathlib import Path
 
 RUN_ID = datetime.now().strftime("%Y%m%d_%H%M%S")
 
+_DEFAULT_LOG_DIR = Path(__file__).resolve().parent / "logs"
+
 class Logger:
 
     def __init__(self, log_path: str = None, ver_cli: bool = False, reuse_window: int = 5):
@@ -18,27 +24,37 @@ class Logger:
         Si existe un log creado dentro de los últimos `reuse_window` segundos,
         reutiliza ese mismo archivo.
         """
-        LOG_DIR = Path(__file__).parent / "logs" if not self.log_path else Path(self.log_path).resolve() 
+        LOG_DIR = _DEFAULT_LOG_DIR if not self.log_path else Path(self.log_path).resolve()
         LOG_DIR.mkdir(exist_ok=True)
 
-        # Buscar logs existentes recientes
-        log_files = sorted(LOG_DIR.glob("pipeline_*.log"), reverse=True)
+        # Buscar el log más reciente en una sola pasada de scandir, sin ordenar
+        # todo el directorio (los nombres con timestamp ordenan lexicográficamente)
         now = datetime.now()
 
         LOG_FILE = None
-        for file in log_files:
+        with os.scandir(LOG_DIR) as it:
+            best = max(
+                (e for e in it
+                 if e.is_file() and e.name.startswith("pipeline_") and e.name.endswith(".log")),
+                key=lambda e: e.name,
+                default=None,
+            )
+
+        if best is not None:
             try:
-                # Extraer el timestamp del nombre del archivo
-                ts_str = file.name.replace("pipeline_", "").replace(".log", "")
-                ts = datetime.strptime(ts_str, "%Y%m%d_%H%M%S")
-                diff = (now - ts).total_seconds()
+                # Formato fijo YYYYMMDD_HHMMSS: slicing + int() es ~10x más
+                # rápido que strptime y no interpreta el format-string
+                s = best.name[len("pipeline_"):-len(".log")]
+                ts = datetime(
+                    int(s[0:4]), int(s[4:6]), int(s[6:8]),
+                    int(s[9:11]), int(s[11:13]), int(s[13:15]),
+                )
 
                 # Si el archivo fue creado hace menos de N segundos, reutilizarlo
-                if diff <= self.reuse_window:
-                    LOG_FILE = file
-                    break
+                if (now - ts).total_seconds() <= self.reuse_window:
+                    LOG_FILE = LOG_DIR / best.name
             except ValueError:
-                continue
+                pass
 
         # Si no hay log reciente, crear uno nuevo
         if LOG_FILE is None:
@@ -48,11 +64,12 @@ class Logger:
         logger.setLevel(logging.DEBUG)
 
         if not logger.handlers:
+            handlers = []
             if self.ver_cli:
                 ch = logging.StreamHandler(sys.stdout)
                 ch.setLevel(logging.INFO)
                 ch.setFormatter(logging.Formatter("[%(levelname)s] %(message)s"))
-                logger.addHandler(ch)
+                handlers.append(ch)
 
             fh = logging.FileHandler(LOG_FILE, mode="a")  # append, no overwrite
             fh.setLevel(logging.DEBUG)
@@ -60,6 +77,14 @@ class Logger:
                 "[%(asctime)s] [%(levelname)s] %(name)s - %(message)s",
                 datefmt="%Y-%m-%d %H:%M:%S",
             ))
-            logger.addHandler(fh)
+            handlers.append(fh)
+
+            # El hilo del pipeline solo encola el registro; un listener en
+            # background hace el I/O real, así el logging no serializa el flujo
+            q = queue.SimpleQueue()
+            listener = logging.handlers.QueueListener(q, *handlers, respect_handler_level=True)
+            listener.start()
+            atexit.register(listener.stop)  # flush pendiente al salir
+            logger.addHandler(logging.handlers.QueueHandler(q))
 
         return logger
\ No newline at end of file
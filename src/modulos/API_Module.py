@@ -1,6 +1,7 @@
 import time
 import requests
 import polars as pl
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Dict, Union, Generator
 from src.pipeline_engine.NodesEngine import BaseNode
 
@@ -20,6 +21,7 @@ class APIReaderNode(BaseNode):
     Configuración esperada en YAML:
     -------------------------------
     - api_url: url de la APi que se leera (obligatorio)
+    - api_urls: lista de urls a leer en paralelo (opcional, reemplaza api_url)
     - timeout: timeout de la api (por defecto 5 segundos)
     - params: Parametros de lectura de la API (Opcional: por defecto en blanco)
     - selected: Lista de campos para seleccion de la API (Opcional, por defecto en blanco)
@@ -39,10 +41,20 @@ class APIReaderNode(BaseNode):
             - param2
             - paramN
     """
+    # Session compartida a nivel de clase: keep-alive reutiliza la conexión
+    # TCP/TLS (y la resolución DNS) entre llamadas, en vez de renegociar todo
+    # en cada requests.get(). Los errores transitorios de gateway se
+    # reintentan en la capa urllib3 con backoff, sin llegar a Python; el 429
+    # se maneja en run() para poder respetar Retry-After.
+    _retry = requests.adapters.Retry(total=3, backoff_factor=0.2, status_forcelist=[502, 503, 504])
+    _session = requests.Session()
+    _session.mount("https://", requests.adapters.HTTPAdapter(pool_connections=10, pool_maxsize=10, max_retries=_retry))
+    _session.mount("http://", requests.adapters.HTTPAdapter(pool_connections=10, pool_maxsize=10, max_retries=_retry))
+
     def __init__(self, name: str, config: Dict[str, Any] = None):
         super().__init__(name, config)
         self.logger = None
-   
+
     def run(
         self, 
         data: Any = None,
@@ -52,39 +64,65 @@ class APIReaderNode(BaseNode):
             la URL presente en el YAML.
         """
         api_url = self.config.get("api_url", None)
+        api_urls = self.config.get("api_urls", None)
         timeout = self.config.get("timeout", 5)
         params = self.config.get("params", {})
         selected = self.config.get("selected", [])
         salida = self.config.get("salida", "data")
-        
+        max_retries = self.config.get("max_retries", 5)
 
         try:
+            if api_urls:
+                # Varias URLs en paralelo sobre la misma session compartida:
+                # las esperas de red se solapan y el pool de conexiones del
+                # adapter reutiliza los sockets entre workers
+                self.logger.info(f"[{self.name}] Extrayendo datos de {len(api_urls)} APIs en paralelo.")
+                with ThreadPoolExecutor(max_workers=min(len(api_urls), 8)) as executor:
+                    responses = list(executor.map(
+                        lambda url: self._session.get(url, params=params, timeout=timeout),
+                        api_urls,
+                    ))
+                api_data = pl.concat(
+                    [pl.read_json(response.content) for response in responses],
+                    how="vertical_relaxed", rechunk=False,
+                )
+                if selected:
+                    api_data = api_data.select(selected)
+                return {salida: api_data}
+
             self.logger.info(f"Extrayendo datos desde la API: {api_url}")
 
-            response = requests.get(
-                api_url, 
-                params=params, 
-                timeout=timeout
-            )
+            for intento in range(max_retries):
+                response = self._session.get(
+                    api_url,
+                    params=params,
+                    timeout=timeout
+                )
+
+                if response.status_code != 429:  # Estado para "too Many Request"
+                    break
 
-            if response.status_code == 429:  # Estado para "too Many Request"
-                retry_after = int(response.headers.get("Retry-After", 1))
-                time.sleep(retry_after)
-                self.logger.info(f"[{self.name}] Reintentando conexión a la API {api_url}")
-                return APIReaderNode.run()
+                # Respetar Retry-After si viene; si no, backoff exponencial acotado
+                retry_after = response.headers.get("Retry-After")
+                espera = int(retry_after) if retry_after else min(0.5 * 2 ** intento, 30)
+                self.logger.info(f"[{self.name}] API saturada (429), reintento {intento + 1}/{max_retries} en {espera}s: {api_url}")
+                time.sleep(espera)
+            else:
+                raise RuntimeError(f"[{self.name}] La API {api_url} respondió 429 tras {max_retries} intentos")
 
-            api_data = response.json()
+            # Los bytes crudos van directo al lector Rust de Polars, sin pasar
+            # por el árbol de dicts/listas de Python que construye response.json()
+            api_data = pl.read_json(response.content)
 
-            if api_data:
+            if not api_data.is_empty():
                 self.logger.info(f"[{self.name}] Conexión a la API {api_url} exitosa.")
-                
-                if selected: 
-                    dicc = {key: api_data[0][key] for key in selected} 
+
+                if selected:
                     self.logger.info(f"[{self.name}] Recolectando datos {selected}")
-                    return {salida: pl.DataFrame([dicc])}
+                    return {salida: api_data.select(selected)}
                 else:
                     self.logger.info(f"[{self.name}] Recolectando todos los datos de la API.")
-                    return {salida: pl.DataFrame(api_data)}
+                    return {salida: api_data}
         
         except Exception as e:
             self.logger.error(f"Error al extraer datos: {e}")
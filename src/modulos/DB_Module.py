@@ -1,3 +1,4 @@
+import io
 import polars as pl
 from typing import Dict, Any
 
@@ -35,24 +36,40 @@ class DatabaseNode(BaseNode):
         query = f"INSERT INTO {self.table} ({', '.join(columns)}) VALUES ({placeholders})"
         self.db_manager.insert(query, row)
 
-    def _insert_polars_df(self, df: pl.DataFrame):
-        """Inserta un DataFrame completo de Polars."""
+    def _insert_polars_df(self, df: pl.DataFrame, chunk_size: int = 10_000):
+        """Inserta un DataFrame completo de Polars en lotes vía executemany."""
         if df.is_empty():
             if self.logger:
                 self.logger.warning(f"[{self.name}] DataFrame vacío. No se insertan filas.")
             return
 
-        records = df.to_dicts()
-        for i, row in enumerate(records):
+        columns = df.columns
+
+        # PostgreSQL: COPY FROM STDIN se salta el INSERT fila a fila por completo
+        if self.db_manager.db_type == "postgresql":
+            buf = io.BytesIO()
+            df.write_csv(buf, include_header=False)
+            buf.seek(0)
+            self.db_manager.copy_from_csv(self.table, columns, buf)
+            if self.logger:
+                self.logger.info(f"[{self.name}] {df.height} filas insertadas en {self.table} vía COPY.")
+            return
+
+        placeholders = ', '.join(f':{k}' for k in columns)
+        query = f"INSERT INTO {self.table} ({', '.join(columns)}) VALUES ({placeholders})"
+
+        insertadas = 0
+        for chunk in df.iter_slices(chunk_size):
             try:
-                self._insert_row(row)
+                self.db_manager.insert_many(query, chunk.to_dicts())
+                insertadas += chunk.height
             except Exception as e:
                 if self.logger:
-                    self.logger.error(f"[{self.name}] Error insertando fila {i}: {e}")
+                    self.logger.error(f"[{self.name}] Error insertando lote (filas {insertadas}-{insertadas + chunk.height}): {e}")
                 raise
 
         if self.logger:
-            self.logger.info(f"[{self.name}] {len(records)} filas insertadas en {self.table}.")
+            self.logger.info(f"[{self.name}] {insertadas} filas insertadas en {self.table}.")
 
     def run(self, data: Any = None):
         """Ejecuta el nodo (insert o select)."""
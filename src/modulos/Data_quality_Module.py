@@ -3,6 +3,10 @@ import datetime
 from typing import Any, Generator, Union, Dict
 from src.pipeline_engine.NodesEngine import BaseNode
 
+# Patrón compartido por todas las reglas formato_email; hoisted a nivel de
+# módulo para no reconstruirlo en cada regla de cada chunk
+EMAIL_RE = r"^[\w\.-]+@[\w\.-]+\.\w+$"
+
 class DataQualityNode(BaseNode):
     """
     DataQualityNode valida la calidad de los datos según reglas configurables.
@@ -31,7 +35,7 @@ class DataQualityNode(BaseNode):
         
 
     def run(
-        self, 
+        self,
         data: Any
     ) -> Union[pl.DataFrame, Generator[pl.DataFrame, None, None]]:
         resultados = []
@@ -40,6 +44,62 @@ class DataQualityNode(BaseNode):
         salida = self.config.get("salida", "data")
         total = data.height
 
+        # Las reglas que escanean datos se acumulan como expresiones de
+        # agregación y se resuelven todas en un único select (una sola pasada
+        # sobre el frame, en vez de un filter/height por regla). Las reglas
+        # basadas en dtype (validacion_boolean, formato_fecha) se resuelven
+        # directamente desde el esquema, sin escanear.
+        aggs = []
+        pendientes = []  # (índice en resultados, alias, regla)
+
+        def _diferir(columna, regla, expr):
+            alias = f"__dq_{len(aggs)}"
+            aggs.append(expr.alias(alias))
+            pendientes.append((len(resultados), alias, regla))
+            resultados.append({"columna": columna, "regla": regla, "estado": "", "detalle": ""})
+
+        def _resolver():
+            # Resuelve en un solo select las agregaciones acumuladas hasta el
+            # momento. Se invoca también antes de que una regla mute el frame
+            # (formato_fecha), para que las reglas ya registradas evalúen los
+            # valores originales y no los post-conversión.
+            if not aggs:
+                return
+            valores = data.lazy().select(aggs).collect().row(0, named=True)
+
+            for idx, alias, regla in pendientes:
+                v = valores[alias]
+
+                if regla == "no_nulos":
+                    estado = "OK" if v == 0 else "FALLA"
+                    detalle = f"{v} valores nulos"
+                elif regla == "valores_positivos":
+                    estado = "OK" if v == 0 else "FALLA"
+                    detalle = f"{v} valores negativos"
+                elif regla == "formato_email":
+                    estado = "OK" if v == 0 else "FALLA"
+                    detalle = f"{v} correos inválidos"
+                elif regla == "no_duplicados":
+                    duplicados = total - v
+                    estado = "OK" if duplicados == 0 else "FALLA"
+                    detalle = f"{duplicados} duplicados encontrados"
+                elif regla == "fecha_no_futura":
+                    estado = "OK" if v == 0 else "FALLA"
+                    detalle = f"{v} registros con fecha futura"
+                elif regla == "edad_mayor_18":
+                    estado = "OK" if v == 0 else "FALLA"
+                    detalle = f"{v} registros con edad menor a 18"
+                elif regla == "nulos_mayor_95":
+                    porcentaje_nulos = (v / total) * 100 if total > 0 else 0
+                    estado = "FALLA" if porcentaje_nulos > 95 else "OK"
+                    detalle = f"{porcentaje_nulos:.2f}% de nulos en la columna"
+
+                resultados[idx]["estado"] = estado
+                resultados[idx]["detalle"] = detalle
+
+            aggs.clear()
+            pendientes.clear()
+
         for regla_conf in reglas:
             columna = regla_conf.get("columna")
             regla = regla_conf.get("regla")
@@ -54,88 +114,79 @@ class DataQualityNode(BaseNode):
                 continue
 
             if regla == "no_nulos":
-                faltantes = data[columna].null_count()
-                estado = "OK" if faltantes == 0 else "FALLA"
-                detalle = f"{faltantes} valores nulos"
+                _diferir(columna, regla, pl.col(columna).null_count())
+                continue
 
             elif regla == "valores_positivos":
-                negativos = data.filter(pl.col(columna) < 0).height
-                estado = "OK" if negativos == 0 else "FALLA"
-                detalle = f"{negativos} valores negativos"
+                _diferir(columna, regla, (pl.col(columna) < 0).sum())
+                continue
 
             elif regla == "formato_email":
-                regex = r"^[\w\.-]+@[\w\.-]+\.\w+$"
-                invalidos = data.filter(~pl.col(columna).cast(pl.Utf8).str.contains(regex)).height
-                estado = "OK" if invalidos == 0 else "FALLA"
-                detalle = f"{invalidos} correos inválidos"
-            
+                _diferir(columna, regla, (~pl.col(columna).cast(pl.Utf8).str.contains(EMAIL_RE)).sum())
+                continue
+
             elif regla == "no_duplicados":
-                unicos = data.select(pl.col(columna).n_unique()).item()
-                duplicados = total - unicos
-                estado = "OK" if duplicados == 0 else "FALLA"
-                detalle = f"{duplicados} duplicados encontrados"
-            
+                _diferir(columna, regla, pl.col(columna).n_unique())
+                continue
+
             elif regla == "validacion_boolean":
                 try:
-                    serie = data[columna]
-                    dtype = serie.dtype
+                    dtype = data.schema[columna]
 
                     if dtype == pl.Boolean:
                         estado = "OK"
                         detalle = f"Columna '{columna}' es tipo booleano."
-                    
+
                     else:
                         estado = "FALLA"
                         detalle = "Valores no corresponden a booleanos"
-                
+
                 except Exception as e:
                     estado = "FALLA"
                     detalle = f"Error al validar columna booleana: {e}"
 
             elif regla == "formato_fecha":
+                # Esta regla puede reescribir la columna: antes de mutar el
+                # frame se liquidan las agregaciones pendientes
+                _resolver()
                 try:
-                    serie = data[columna]
+                    dtype = data.schema[columna]
 
-                    if serie.dtype in [pl.Datetime, pl.Date]:
+                    if dtype in [pl.Datetime, pl.Date]:
                         estado = "OK"
-                        detalle = f"Columna '{columna}' ya es tipo {serie.dtype}"
-                    
+                        detalle = f"Columna '{columna}' ya es tipo {dtype}"
+
                     # para fechas con formato timestamp - UNIX
-                    elif serie.dtype in [pl.Int64, pl.UInt64, pl.Float64]:
+                    elif dtype in [pl.Int64, pl.UInt64, pl.Float64]:
                         data = data.with_columns(pl.from_epoch(pl.col(columna)).alias(columna))
                         estado = "OK"
                         detalle = f"Columna '{columna}' convertida desde timestamp numérico"
-                    
-                    elif serie.dtype == pl.Utf8:
+
+                    elif dtype == pl.Utf8:
                         data = data.with_columns(pl.col(columna).str.strptime(pl.Datetime, format="%Y-%m-%d %H:%M:%S", strict=False))
                         estado = "OK"
                         detalle = f"Columna '{columna}' convertida desde string"
-                    
+
                     else:
                         estado = "FALLA"
-                        detalle = f"Tipo no compatible para fecha: {serie.dtype}"
-                
+                        detalle = f"Tipo no compatible para fecha: {dtype}"
+
                 except Exception as e:
                     estado = "FALLA"
                     detalle = f"Error al validar formato fecha: {e}"
 
             elif regla == "fecha_no_futura":
-                hoy = datetime.now().date()
-                futuras = data.filter(pl.col(columna).cast(pl.Datetime) > hoy).height
-                estado = "OK" if futuras == 0 else "FALLA"
-                detalle = f"{futuras} registros con fecha futura"
+                hoy = datetime.datetime.now()
+                _diferir(columna, regla, (pl.col(columna).cast(pl.Datetime) > hoy).sum())
+                continue
 
             elif regla == "edad_mayor_18":
-                menores = data.filter(pl.col(columna) < 18).height
-                estado = "OK" if menores == 0 else "FALLA"
-                detalle = f"{menores} registros con edad menor a 18"
-            
+                _diferir(columna, regla, (pl.col(columna) < 18).sum())
+                continue
+
             elif regla == "nulos_mayor_95":
-                nulos = data[columna].null_count()
-                porcentaje_nulos = (nulos / total) * 100 if total > 0 else 0
-                estado = "FALLA" if porcentaje_nulos > 95 else "OK"
-                detalle = f"{porcentaje_nulos:.2f}% de nulos en la columna"
-            
+                _diferir(columna, regla, pl.col(columna).null_count())
+                continue
 
             else:
                 estado = "FALLA"
@@ -148,6 +199,9 @@ class DataQualityNode(BaseNode):
                 "detalle": detalle
             })
 
+        # Una sola pasada sobre el frame para las reglas diferidas restantes
+        _resolver()
+
         resultados.append({
                 "columna": "Total Registros",
                 "regla": "",
@@ -155,4 +209,4 @@ class DataQualityNode(BaseNode):
                 "detalle": f"{total} de registros"
             })
 
-        return {salida: pl.DataFrame(resultados)} 
\ No newline at end of file
+        return {salida: pl.DataFrame(resultados)}
\ No newline at end of file
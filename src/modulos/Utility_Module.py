@@ -1,371 +1,560 @@
-import polars as pl
-from typing import Dict, Any
-
-from src.pipeline_engine.NodesEngine import BaseNode
-
-class FilterNode(BaseNode):
-    """
-    FilterNode permite aplicar una condición lógica sobre un DataFrame de Polars.
-    La condición debe ser una expresión en formato Polars, usando su sintaxis
-    (por ejemplo, `pl.col("edad") > 30 & (pl.col("pais") == "Colombia")`).
-
-    Parámetros YAML esperados:
-    --------------------------
-    - condition : str
-        Expresión lógica en formato Polars.
-        Ejemplo: 'pl.col("edad") > 30 & (pl.col("pais") == "Colombia")'
-
-    Ejemplo de uso en YAML:
-    -----------------------
-    - name: FiltrarAdultosColombianos
-      type: FilterNode
-      parameters:
-        config:
-            condition: 'pl.col("edad") > 30 & (pl.col("pais") == "Colombia")'
-    """
-    required_inputs = ["data"]
-
-    def __init__(self, name: str, config: Dict[str, Any] = None):
-        super().__init__(name, config)
-        self.logger = None
-
-    def run(self, data: Any):
-        """
-        Aplica un filtro dinámico sobre un DataFrame de Polars.
-        Devuelve un nuevo DataFrame filtrado.
-        """
-        data = data["data"]
-        condition_str = self.config.get("condition")
-        salida = self.config.get("salida", "data")
-
-        if not condition_str:
-            raise ValueError(f"[{self.name}] Falta 'condition' en config.")
-
-        if not isinstance(data, (pl.DataFrame, pl.LazyFrame)):
-            raise TypeError(f"[{self.name}] Se esperaba un DataFrame o LazyFrame de Polars, no {type(data)}.")
-
-        try:
-            # Convertimos el string a una expresión evaluable de Polars
-            condition_expr = eval(condition_str, {"pl": pl})
-            if not isinstance(condition_expr, pl.Expr):
-                raise ValueError(f"[{self.name}] La condición no generó una expresión válida de Polars.")
-
-            # Aplicamos el filtro
-            self.logger and self.logger.debug(f"[{self.name}] Aplicando filtro: {condition_str}")
-            filtered_df = data.filter(condition_expr)
-
-            return {salida: filtered_df} 
-
-        except Exception as e:
-            msg = f"[{self.name}] Error evaluando la condición '{condition_str}': {e}"
-            if self.logger:
-                self.logger.error(msg)
-            raise RuntimeError(msg)
-
-class DropDuplicateNode(BaseNode):
-    """
-    DropDuplicateNode elimina filas duplicadas de un DataFrame de Polars.
-
-    Parámetros YAML esperados:
-    --------------------------
-    - columnas : List (Opcional)
-        Lista de columnas sobre las cuales se eliminarán duplicados.
-        Si no se especifica, se eliminan duplicados considerando todas las columnas.
-
-    Ejemplo de uso en YAML:
-    -----------------------
-    - name: EliminarDuplicados
-      type: DropDuplicateNode
-      parameters:
-        config:
-            columnas:
-                - columna_1
-                - columna_2
-    """
-    required_inputs = ["data"]
-
-    def __init__(self, name: str, config: Dict[str, Any] = None):
-        super().__init__(name, config)
-        self.logger = None
-
-    def run(self, data: Any):
-        """
-        Elimina filas duplicadas de un DataFrame de Polars.
-
-        Args:
-            data (pl.DataFrame): DataFrame de entrada.
-        Returns:
-            pl.DataFrame: DataFrame sin duplicados.
-        """
-        data = data["data"]
-        columnas = self.config.get("columnas", None)
-        salida = self.config.get("salida", "data")
-
-        if not isinstance(data, (pl.DataFrame, pl.LazyFrame)):
-            raise TypeError(f"[{self.name}] Se esperaba un DataFrame o LazyFrame de Polars, no {type(data)}.")
-
-        try:
-            # Si no se especifican columnas, se usan todas
-            subset = columnas if columnas else None
-
-            if self.logger:
-                if subset:
-                    self.logger.info(f"[{self.name}] Eliminando duplicados sobre columnas: {subset}")
-                else:
-                    self.logger.info(f"[{self.name}] Eliminando duplicados considerando todas las columnas")
-
-            # Elimina duplicados
-            df_sin_duplicados = data.unique(subset=subset, keep="first")
-
-            return {salida: df_sin_duplicados} 
-
-        except Exception as e:
-            msg = f"[{self.name}] Error eliminando duplicados: {e}"
-            if self.logger:
-                self.logger.error(msg)
-            raise RuntimeError(msg)
-
-class DropNullteNode(BaseNode):
-    """
-    DropNullteNode (Polars) elimina o reemplaza valores nulos en un DataFrame.
-
-    Parámetros YAML esperados:
-    --------------------------
-    - columnas : List (Opcional)
-        Columnas sobre las cuales se eliminarán filas con valores nulos.
-        Si no se especifica, se evaluarán todas las columnas.
-
-    - fillna : Dict (Opcional)
-        Diccionario de columnas y valores por defecto para reemplazar nulos.
-        Ejemplo:
-            fillna:
-                columna_1: "valor_default"
-                columna_2: 0
-
-    Ejemplo de uso en YAML:
-    -----------------------
-    - name: LimpiarNulos
-      type: DropNullteNode
-      parameters:
-        config:
-            columnas:
-                - columna_1
-                - columna_2
-            fillna:
-                columna_1: "desconocido"
-                columna_2: 0
-    """
-    required_inputs = ["data"]
-
-    def __init__(self, name: str, config: Dict[str, Any] = None):
-        super().__init__(name, config)
-        self.logger = None
-
-    def run(self, data: Any):
-        data = data["data"]
-        columnas = self.config.get("columnas", None)
-        drop_all = self.config.get("drop_all", False) 
-        fillna = self.config.get("fillna", {})
-        salida = self.config.get("salida", "data")
-
-        if not isinstance(data, (pl.DataFrame, pl.LazyFrame)):
-            raise TypeError(f"[{self.name}] Se esperaba un DataFrame o LazyFrame de Polars, no {type(data)}.")
-
-        try:
-
-            # Eliminar filas con nulos en las columnas especificadas
-            if columnas:
-                if self.logger:
-                    self.logger.info(f"[{self.name}] Eliminando filas con nulos en columnas: {columnas}")
-                data = data.drop_nulls(subset=columnas)
-            
-            if drop_all:
-                if self.logger:
-                    self.logger.info(f"[{self.name}] Eliminando filas con nulos en cualquier columna")
-                data = data.drop_nulls()
-            
-            # Reemplazar valores nulos según fillna
-            if fillna:
-                if self.logger:
-                    self.logger.info(f"[{self.name}] Reemplazando valores nulos con fillna: {fillna}")
-                for columna, valor in fillna.items():
-                    data = data.with_columns(pl.col(columna).fill_null(valor))
-            
-            return {salida: data} 
-
-        except Exception as e:
-            msg = f"[{self.name}] Error procesando nulos: {e}"
-            if self.logger:
-                self.logger.error(msg)
-            raise RuntimeError(msg)
-
-class RenameColumnsNode(BaseNode):
-    """
-    RenameColumnsNode (Polars) permite cambiar el nombre de una o varias columnas
-    de un DataFrame de Polars.
-
-    Parámetros YAML esperados:
-    --------------------------
-    - rename_map : Dict[str, str] (Obligatorio)
-        Diccionario con los mapeos de columnas: {columna_actual: columna_nueva}
-
-    Ejemplo de uso en YAML:
-    -----------------------
-    - name: RenombrarColumnas
-      type: RenameColumnsNode
-      parameters:
-        config:
-            rename_map:
-                old_col1: new_col1
-                old_col2: new_col2
-    """
-    required_inputs = ["data"]
-
-    def __init__(self, name: str, config: Dict[str, Any] = None):
-        super().__init__(name, config)
-        self.logger = None
-
-    def run(self, data: Any) -> pl.DataFrame:
-        data = data["data"]
-        rename_map = self.config.get("rename_map", None)
-        salida = self.config.get("salida", "data")
-
-        if not rename_map:
-            raise ValueError(f"[{self.name}] Falta 'rename_map' en configuración.")
-
-        if not isinstance(data, (pl.DataFrame, pl.LazyFrame)):
-            raise TypeError(f"[{self.name}] Se esperaba un DataFrame o LazyFrame de Polars, no {type(data)}.")
-
-        try:
-            if self.logger:
-                self.logger.info(f"[{self.name}] Renombrando columnas: {rename_map}")
-
-            df = data.rename(rename_map)
-
-            if self.logger:
-                self.logger.debug(f"[{self.name}] Columnas finales: {df.columns}")
-
-            return {salida: df}
-
-        except Exception as e:
-            msg = f"[{self.name}] Error renombrando columnas: {e}"
-            if self.logger:
-                self.logger.error(msg)
-            raise RuntimeError(msg)
-
-
-class CastColumnsNode(BaseNode):
-    """
-        Castea columnas según el tipo especificado en YAML.
-        Optimizado para reducir consumo de memoria.
-    """
-    required_inputs = ["data"]
-
-    def __init__(self, name: str, config: Dict[str, Any] = None):
-        super().__init__(name, config)
-        self.logger = None
-
-    def _normalize_boolean(self, expr: pl.Expr) -> pl.Expr:
-        """
-        Normaliza valores booleanos representados como texto o números.
-        Ej: "t", "true", "v", "1", "si" → True
-            "f", "false", "0", "no" → False
-        """
-        verdaderos = ["t", "true", "1", "y", "yes", "v", "verdadero", "si"]
-        falsos = ["f", "false", "0", "n", "no", "falso"]
-
-        return (
-            expr.cast(pl.Utf8)
-            .str.to_lowercase()
-            .map_elements(lambda x: True if x in verdaderos else False if x in falsos else None, return_dtype=pl.Boolean)
-        )
-
-    def run(self, data: Any) -> pl.DataFrame:
-
-        salida = self.config.get("salida", "data")
-        data = data["data"]
-
-        if not isinstance(data, (pl.DataFrame, pl.LazyFrame)):
-            raise TypeError(f"[{self.name}] Se esperaba un DataFrame o LazyFrame de Polars, no {type(data)}.")
-
-        cast_map = self.config.get("cast_map", {})
-        df = data
-
-        for col, dtype in cast_map.items():
-            if col not in df.columns:
-                if self.logger:
-                    self.logger.warning(f"[{self.name}] Columna '{col}' no encontrada, se omite.")
-                continue
-
-            try:
-                if dtype == "timestamp":
-                    df = df.with_columns(pl.col(col).str.to_datetime(strict=False).alias(col))
-                elif dtype == "int":
-                    df = df.with_columns(pl.col(col).cast(pl.Int64).alias(col))
-                elif dtype == "float":
-                    df = df.with_columns(pl.col(col).cast(pl.Float64).alias(col))
-                elif dtype == "str":
-                    df = df.with_columns(pl.col(col).cast(pl.Utf8).alias(col))
-                elif dtype == "category": 
-                    df = df.with_columns(pl.col(col).cast(pl.Categorical).alias(col))
-                elif dtype == "bool":
-                    df = df.with_columns(self._normalize_boolean(pl.col(col)).alias(col))
-                else:
-                    if self.logger:
-                        self.logger.warning(f"[{self.name}] Tipo '{dtype}' no soportado en columna '{col}'.")
-            except Exception as e:
-                if self.logger:
-                    self.logger.warning(f"[{self.name}] Error al castear '{col}' a {dtype}: {e}")
-
-        return {salida: df} 
-
-
-class DropColumnsNode(BaseNode):
-    """
-    DropColumnsNode (Polars) elimina columnas específicas de un DataFrame.
-
-    Parámetros YAML esperados:
-    --------------------------
-    - columnas : List
-        Columnas que se desean eliminar del DataFrame o LazyFrame.
-
-    Ejemplo de uso en YAML:
-    -----------------------
-    - name: EliminarColumnas
-      type: DropColumnsNode
-      parameters:
-        config:
-            columnas:
-                - columna_1
-                - columna_2
-    """
-    required_inputs = ["data"]
-
-    def __init__(self, name: str, config: Dict[str, Any] = None):
-        super().__init__(name, config)
-        self.logger = None
-
-    def run(self, data: Any):
-        data = data["data"]
-        columnas = self.config.get("columnas", [])
-        salida = self.config.get("salida", "data")
-
-        if not isinstance(data, (pl.DataFrame, pl.LazyFrame)):
-            raise TypeError(f"[{self.name}] Se esperaba un DataFrame o LazyFrame de Polars, no {type(data)}.")
-
-        try:
-            if columnas:
-                if self.logger:
-                    self.logger.info(f"[{self.name}] Eliminando columnas: {columnas}")
-                data = data.drop(columnas)
-            else:
-                if self.logger:
-                    self.logger.warning(f"[{self.name}] No se especificaron columnas para eliminar, se retorna el DataFrame sin cambios.")
-
-            return {salida: data}
-
-        except Exception as e:
-            msg = f"[{self.name}] Error eliminando columnas: {e}"
-            if self.logger:
-                self.logger.error(msg)
-            raise RuntimeError(msg)
+import functools
+import polars as pl
+from typing import Dict, Any
+
+from src.pipeline_engine.NodesEngine import BaseNode
+
+
+@functools.lru_cache(maxsize=1024)
+def _compile_condition(condition_str: str) -> pl.Expr:
+    """
+    Compila (una sola vez por string) la condición YAML a una expresión de
+    Polars. Sin el caché, cada run() pagaba parser + compilador de Python
+    completos para reconstruir exactamente la misma pl.Expr.
+    """
+    condition_expr = eval(compile(condition_str, "<filter>", "eval"), {"pl": pl})
+    if not isinstance(condition_expr, pl.Expr):
+        raise ValueError("La condición no generó una expresión válida de Polars.")
+    return condition_expr
+
+
+class FilterNode(BaseNode):
+    """
+    FilterNode permite aplicar una condición lógica sobre un DataFrame de Polars.
+    La condición debe ser una expresión en formato Polars, usando su sintaxis
+    (por ejemplo, `pl.col("edad") > 30 & (pl.col("pais") == "Colombia")`).
+
+    Parámetros YAML esperados:
+    --------------------------
+    - condition : str
+        Expresión lógica en formato Polars.
+        Ejemplo: 'pl.col("edad") > 30 & (pl.col("pais") == "Colombia")'
+
+    Ejemplo de uso en YAML:
+    -----------------------
+    - name: FiltrarAdultosColombianos
+      type: FilterNode
+      parameters:
+        config:
+            condition: 'pl.col("edad") > 30 & (pl.col("pais") == "Colombia")'
+    """
+    required_inputs = ["data"]
+
+    def __init__(self, name: str, config: Dict[str, Any] = None):
+        super().__init__(name, config)
+        self.logger = None
+        self._condition_expr = None
+
+    def prepare(self):
+        """
+        Valida y compila la condición una sola vez antes de ejecutar el DAG;
+        run() solo lee la expresión ya compilada.
+        """
+        condition_str = self.config.get("condition")
+        if not condition_str:
+            raise ValueError(f"[{self.name}] Falta 'condition' en config.")
+        try:
+            self._condition_expr = _compile_condition(condition_str)
+        except Exception as e:
+            raise RuntimeError(f"[{self.name}] Error evaluando la condición '{condition_str}': {e}")
+
+    def run(self, data: Any):
+        """
+        Aplica un filtro dinámico sobre un DataFrame de Polars.
+        Devuelve un nuevo DataFrame filtrado.
+        """
+        data = data["data"]
+        condition_str = self.config.get("condition")
+
+        if not condition_str:
+            raise ValueError(f"[{self.name}] Falta 'condition' en config.")
+
+        if not isinstance(data, (pl.DataFrame, pl.LazyFrame)):
+            raise TypeError(f"[{self.name}] Se esperaba un DataFrame o LazyFrame de Polars, no {type(data)}.")
+
+        try:
+            # Expresión precompilada en prepare(); el camino directo (nodo
+            # usado sin motor) compila aquí con el mismo caché
+            condition_expr = self._condition_expr
+            if condition_expr is None:
+                condition_expr = _compile_condition(condition_str)
+
+            # lazy: true difiere la ejecución; el collect lo hace un
+            # CollectNode (u otro sink) al final de la cadena
+            if self.config.get("lazy", False) and isinstance(data, pl.DataFrame):
+                data = data.lazy()
+
+            # Aplicamos el filtro
+            self.logger and self.logger.debug(f"[{self.name}] Aplicando filtro: {condition_str}")
+            filtered_df = data.filter(condition_expr)
+
+            # Frame pelado: el motor lo despacha bajo self._salida
+            return filtered_df
+
+        except Exception as e:
+            msg = f"[{self.name}] Error evaluando la condición '{condition_str}': {e}"
+            if self.logger:
+                self.logger.error(msg)
+            raise RuntimeError(msg)
+
+class DropDuplicateNode(BaseNode):
+    """
+    DropDuplicateNode elimina filas duplicadas de un DataFrame de Polars.
+
+    Parámetros YAML esperados:
+    --------------------------
+    - columnas : List (Opcional)
+        Lista de columnas sobre las cuales se eliminarán duplicados.
+        Si no se especifica, se eliminan duplicados considerando todas las columnas.
+
+    Ejemplo de uso en YAML:
+    -----------------------
+    - name: EliminarDuplicados
+      type: DropDuplicateNode
+      parameters:
+        config:
+            columnas:
+                - columna_1
+                - columna_2
+    """
+    required_inputs = ["data"]
+
+    def __init__(self, name: str, config: Dict[str, Any] = None):
+        super().__init__(name, config)
+        self.logger = None
+
+    def run(self, data: Any):
+        """
+        Elimina filas duplicadas de un DataFrame de Polars.
+
+        Args:
+            data (pl.DataFrame): DataFrame de entrada.
+        Returns:
+            pl.DataFrame: DataFrame sin duplicados.
+        """
+        data = data["data"]
+        columnas = self.config.get("columnas", None)
+
+        if not isinstance(data, (pl.DataFrame, pl.LazyFrame)):
+            raise TypeError(f"[{self.name}] Se esperaba un DataFrame o LazyFrame de Polars, no {type(data)}.")
+
+        try:
+            # Si no se especifican columnas, se usan todas
+            subset = columnas if columnas else None
+
+            if self.logger:
+                if subset:
+                    self.logger.info(f"[{self.name}] Eliminando duplicados sobre columnas: {subset}")
+                else:
+                    self.logger.info(f"[{self.name}] Eliminando duplicados considerando todas las columnas")
+
+            if self.config.get("lazy", False) and isinstance(data, pl.DataFrame):
+                data = data.lazy()
+
+            # Frames eager grandes pasan por el motor de streaming: misma
+            # tabla hash pero ejecutada por chunks, con menor pico de memoria.
+            # El umbral evita pagar el plan lazy en frames chicos.
+            grande = isinstance(data, pl.DataFrame) and data.height > 10_000
+            if grande:
+                data = data.lazy()
+
+            # Elimina duplicados. Con subset, filtrar por is_first_distinct
+            # sobre el struct de las columnas evita reconstruir la tabla hash
+            # completa de unique() y además preserva el orden de las filas
+            if subset:
+                try:
+                    df_sin_duplicados = data.filter(pl.struct(subset).is_first_distinct())
+                except AttributeError:
+                    # Versiones de Polars sin is_first_distinct
+                    df_sin_duplicados = data.unique(subset=subset, keep="first")
+            else:
+                df_sin_duplicados = data.unique(keep="first")
+
+            if grande:
+                df_sin_duplicados = df_sin_duplicados.collect(engine="streaming")
+
+            return df_sin_duplicados
+
+        except Exception as e:
+            msg = f"[{self.name}] Error eliminando duplicados: {e}"
+            if self.logger:
+                self.logger.error(msg)
+            raise RuntimeError(msg)
+
+class DropNullteNode(BaseNode):
+    """
+    DropNullteNode (Polars) elimina o reemplaza valores nulos en un DataFrame.
+
+    Parámetros YAML esperados:
+    --------------------------
+    - columnas : List (Opcional)
+        Columnas sobre las cuales se eliminarán filas con valores nulos.
+        Si no se especifica, se evaluarán todas las columnas.
+
+    - fillna : Dict (Opcional)
+        Diccionario de columnas y valores por defecto para reemplazar nulos.
+        Ejemplo:
+            fillna:
+                columna_1: "valor_default"
+                columna_2: 0
+
+    Ejemplo de uso en YAML:
+    -----------------------
+    - name: LimpiarNulos
+      type: DropNullteNode
+      parameters:
+        config:
+            columnas:
+                - columna_1
+                - columna_2
+            fillna:
+                columna_1: "desconocido"
+                columna_2: 0
+    """
+    required_inputs = ["data"]
+
+    def __init__(self, name: str, config: Dict[str, Any] = None):
+        super().__init__(name, config)
+        self.logger = None
+        self._fill_exprs = None
+
+    def prepare(self):
+        """Precompila las expresiones de fill_null a partir de la config."""
+        fillna = self.config.get("fillna", {})
+        if fillna:
+            self._fill_exprs = [pl.col(columna).fill_null(valor) for columna, valor in fillna.items()]
+
+    def run(self, data: Any):
+        data = data["data"]
+        columnas = self.config.get("columnas", None)
+        drop_all = self.config.get("drop_all", False)
+        fillna = self.config.get("fillna", {})
+
+        if not isinstance(data, (pl.DataFrame, pl.LazyFrame)):
+            raise TypeError(f"[{self.name}] Se esperaba un DataFrame o LazyFrame de Polars, no {type(data)}.")
+
+        try:
+            # Todo el saneo se encadena lazy y se colecta una sola vez, en vez
+            # de materializar un frame por drop_nulls/fill_null individual
+            era_lazy = isinstance(data, pl.LazyFrame)
+            lf = data.lazy()
+
+            # Eliminar filas con nulos en las columnas especificadas. Con
+            # drop_all la pasada por subset es redundante (el drop global la
+            # contiene), así que se omite y queda un solo drop_nulls
+            if columnas and not drop_all:
+                if self.logger:
+                    self.logger.info(f"[{self.name}] Eliminando filas con nulos en columnas: {columnas}")
+                lf = lf.drop_nulls(subset=columnas)
+
+            if drop_all:
+                if self.logger:
+                    self.logger.info(f"[{self.name}] Eliminando filas con nulos en cualquier columna")
+                lf = lf.drop_nulls()
+
+            # Reemplazar valores nulos según fillna, todos en un solo with_columns
+            if fillna:
+                if self.logger:
+                    self.logger.info(f"[{self.name}] Reemplazando valores nulos con fillna: {fillna}")
+                fill_exprs = self._fill_exprs
+                if fill_exprs is None:
+                    fill_exprs = [pl.col(columna).fill_null(valor) for columna, valor in fillna.items()]
+                lf = lf.with_columns(fill_exprs)
+
+            if era_lazy:
+                data = lf
+            else:
+                # usar_streaming: colectar en modo streaming para entradas
+                # que no caben cómodas en memoria
+                data = lf.collect(engine="streaming" if self.config.get("usar_streaming", False) else "in-memory")
+
+            return data
+
+        except Exception as e:
+            msg = f"[{self.name}] Error procesando nulos: {e}"
+            if self.logger:
+                self.logger.error(msg)
+            raise RuntimeError(msg)
+
+class RenameColumnsNode(BaseNode):
+    """
+    RenameColumnsNode (Polars) permite cambiar el nombre de una o varias columnas
+    de un DataFrame de Polars.
+
+    Parámetros YAML esperados:
+    --------------------------
+    - rename_map : Dict[str, str] (Obligatorio)
+        Diccionario con los mapeos de columnas: {columna_actual: columna_nueva}
+
+    Ejemplo de uso en YAML:
+    -----------------------
+    - name: RenombrarColumnas
+      type: RenameColumnsNode
+      parameters:
+        config:
+            rename_map:
+                old_col1: new_col1
+                old_col2: new_col2
+    """
+    required_inputs = ["data"]
+
+    def __init__(self, name: str, config: Dict[str, Any] = None):
+        super().__init__(name, config)
+        self.logger = None
+        # Claves del mapa materializadas una vez para la intersección en run()
+        self._keys = set(self.config.get("rename_map") or {})
+
+    def run(self, data: Any) -> pl.DataFrame:
+        data = data["data"]
+        rename_map = self.config.get("rename_map", None)
+
+        if not rename_map:
+            raise ValueError(f"[{self.name}] Falta 'rename_map' en configuración.")
+
+        if not isinstance(data, (pl.DataFrame, pl.LazyFrame)):
+            raise TypeError(f"[{self.name}] Se esperaba un DataFrame o LazyFrame de Polars, no {type(data)}.")
+
+        try:
+            # Intersección con las columnas reales (solo DataFrame: en lazy
+            # resolver el esquema costaría más que el rename). Solo el caso
+            # vacío devuelve la entrada tal cual, sin frame nuevo; con
+            # coincidencia parcial se deja el rename estricto para que una
+            # clave mal escrita falle igual que en el camino lazy.
+            if isinstance(data, pl.DataFrame):
+                presentes = self._keys & set(data.columns)
+                if not presentes:
+                    if self.logger:
+                        self.logger.warning(f"[{self.name}] Ninguna columna de rename_map presente, se retorna sin cambios.")
+                    return data
+
+            if self.config.get("lazy", False) and isinstance(data, pl.DataFrame):
+                data = data.lazy()
+
+            if self.logger:
+                self.logger.info(f"[{self.name}] Renombrando columnas: {rename_map}")
+
+            df = data.rename(rename_map)
+
+            if self.logger and isinstance(df, pl.DataFrame):
+                self.logger.debug(f"[{self.name}] Columnas finales: {df.columns}")
+
+            return df
+
+        except Exception as e:
+            msg = f"[{self.name}] Error renombrando columnas: {e}"
+            if self.logger:
+                self.logger.error(msg)
+            raise RuntimeError(msg)
+
+
+class CastColumnsNode(BaseNode):
+    """
+        Castea columnas según el tipo especificado en YAML.
+        Optimizado para reducir consumo de memoria.
+    """
+    required_inputs = ["data"]
+
+    def __init__(self, name: str, config: Dict[str, Any] = None):
+        super().__init__(name, config)
+        self.logger = None
+        self._cast_exprs = None
+
+    # A nivel de clase para no re-alocar las listas en cada normalización
+    _VERDADEROS = ("t", "true", "1", "y", "yes", "v", "verdadero", "si")
+    _FALSOS = ("f", "false", "0", "n", "no", "falso")
+
+    def prepare(self):
+        """Construye las expresiones de cast una sola vez a partir del cast_map."""
+        self._cast_exprs = self._build_cast_exprs()
+
+    def _build_cast_exprs(self):
+        """
+        Traduce el cast_map de la config a tuplas (columna, dtype, expr).
+        La presencia de cada columna en el DataFrame se verifica en run(),
+        que es donde se conocen los datos.
+        """
+        exprs = []
+        for col, dtype in self.config.get("cast_map", {}).items():
+            # Un solo constructor pl.col por columna, compartido por las ramas
+            base = pl.col(col)
+            if dtype == "timestamp":
+                exprs.append((col, dtype, base.str.to_datetime(strict=False).alias(col)))
+            elif dtype == "int":
+                exprs.append((col, dtype, base.cast(pl.Int64).alias(col)))
+            elif dtype == "float":
+                exprs.append((col, dtype, base.cast(pl.Float64).alias(col)))
+            elif dtype == "str":
+                exprs.append((col, dtype, base.cast(pl.Utf8).alias(col)))
+            elif dtype == "category":
+                exprs.append((col, dtype, base.cast(pl.Categorical).alias(col)))
+            elif dtype == "bool":
+                exprs.append((col, dtype, self._normalize_boolean(base).alias(col)))
+            else:
+                if self.logger:
+                    self.logger.warning(f"[{self.name}] Tipo '{dtype}' no soportado en columna '{col}'.")
+        return exprs
+
+    def _normalize_boolean(self, expr: pl.Expr) -> pl.Expr:
+        """
+        Normaliza valores booleanos representados como texto o números.
+        Ej: "t", "true", "v", "1", "si" → True
+            "f", "false", "0", "no" → False
+
+        Implementado con is_in nativo (kernel hasheado de Polars) en vez de
+        map_elements, que saldría a Python fila por fila.
+        """
+        lower = expr.cast(pl.Utf8).str.to_lowercase()
+        return (
+            pl.when(lower.is_in(self._VERDADEROS)).then(True)
+            .when(lower.is_in(self._FALSOS)).then(False)
+            .otherwise(None)
+            .cast(pl.Boolean)
+        )
+
+    def run(self, data: Any) -> pl.DataFrame:
+
+        data = data["data"]
+
+        if not isinstance(data, (pl.DataFrame, pl.LazyFrame)):
+            raise TypeError(f"[{self.name}] Se esperaba un DataFrame o LazyFrame de Polars, no {type(data)}.")
+
+        df = data
+
+        # Expresiones precompiladas en prepare(); el camino directo (nodo
+        # usado sin motor) las construye aquí una vez
+        cast_exprs = self._cast_exprs
+        if cast_exprs is None:
+            cast_exprs = self._build_cast_exprs()
+
+        # Todas las expresiones de cast se aplican en un solo with_columns:
+        # Polars paraleliza las columnas en una pasada en vez de construir y
+        # materializar un plan por columna
+        columnas_df = set(df.columns)
+        exprs = []
+        for col, dtype, expr in cast_exprs:
+            if col not in columnas_df:
+                if self.logger:
+                    self.logger.warning(f"[{self.name}] Columna '{col}' no encontrada, se omite.")
+                continue
+            exprs.append((col, dtype, expr))
+
+        if exprs:
+            try:
+                df = df.with_columns([expr for _, _, expr in exprs])
+            except Exception:
+                # Fallback columna a columna para conservar la tolerancia a
+                # casts fallidos: solo se omite la columna problemática
+                for col, dtype, expr in exprs:
+                    try:
+                        df = df.with_columns(expr)
+                    except Exception as e:
+                        if self.logger:
+                            self.logger.warning(f"[{self.name}] Error al castear '{col}' a {dtype}: {e}")
+
+        return df
+
+
+class DropColumnsNode(BaseNode):
+    """
+    DropColumnsNode (Polars) elimina columnas específicas de un DataFrame.
+
+    Parámetros YAML esperados:
+    --------------------------
+    - columnas : List
+        Columnas que se desean eliminar del DataFrame o LazyFrame.
+
+    Ejemplo de uso en YAML:
+    -----------------------
+    - name: EliminarColumnas
+      type: DropColumnsNode
+      parameters:
+        config:
+            columnas:
+                - columna_1
+                - columna_2
+    """
+    required_inputs = ["data"]
+
+    def __init__(self, name: str, config: Dict[str, Any] = None):
+        super().__init__(name, config)
+        self.logger = None
+
+    def run(self, data: Any):
+        data = data["data"]
+        columnas = self.config.get("columnas", [])
+
+        if not isinstance(data, (pl.DataFrame, pl.LazyFrame)):
+            raise TypeError(f"[{self.name}] Se esperaba un DataFrame o LazyFrame de Polars, no {type(data)}.")
+
+        try:
+            if self.config.get("lazy", False) and isinstance(data, pl.DataFrame):
+                data = data.lazy()
+
+            if columnas:
+                if self.logger:
+                    self.logger.info(f"[{self.name}] Eliminando columnas: {columnas}")
+                data = data.drop(columnas)
+            else:
+                if self.logger:
+                    self.logger.warning(f"[{self.name}] No se especificaron columnas para eliminar, se retorna el DataFrame sin cambios.")
+
+            return data
+
+        except Exception as e:
+            msg = f"[{self.name}] Error eliminando columnas: {e}"
+            if self.logger:
+                self.logger.error(msg)
+            raise RuntimeError(msg)
+
+
+class CollectNode(BaseNode):
+    """
+    CollectNode materializa un LazyFrame al final de una cadena lazy.
+
+    Los nodos utilitarios con `lazy: true` difieren su ejecución; este nodo
+    hace el único collect del plan fusionado, opcionalmente en streaming
+    para entradas que no caben en memoria.
+
+    Parámetros YAML esperados:
+    --------------------------
+    - usar_streaming : bool (Opcional)
+        Colecta con el motor de streaming de Polars.
+
+    Ejemplo de uso en YAML:
+    -----------------------
+    - name: Materializar
+      type: CollectNode
+      parameters:
+        config:
+            usar_streaming: true
+    """
+    required_inputs = ["data"]
+
+    def __init__(self, name: str, config: Dict[str, Any] = None):
+        super().__init__(name, config)
+        self.logger = None
+
+    def run(self, data: Any):
+        data = data["data"]
+        usar_streaming = self.config.get("usar_streaming", False)
+
+        if not isinstance(data, (pl.DataFrame, pl.LazyFrame)):
+            raise TypeError(f"[{self.name}] Se esperaba un DataFrame o LazyFrame de Polars, no {type(data)}.")
+
+        try:
+            if isinstance(data, pl.LazyFrame):
+                if self.logger:
+                    self.logger.info(f"[{self.name}] Colectando plan lazy (streaming={usar_streaming})")
+                data = data.collect(engine="streaming" if usar_streaming else "in-memory")
+                # Pista para operación: si el colectado en memoria crece,
+                # conviene activar usar_streaming en el YAML
+                if self.logger and not usar_streaming:
+                    self.logger.info(f"[{self.name}] Colectado en memoria: {data.estimated_size('mb'):.1f} MB")
+
+            return data
+
+        except Exception as e:
+            msg = f"[{self.name}] Error colectando LazyFrame: {e}"
+            if self.logger:
+                self.logger.error(msg)
+            raise RuntimeError(msg)
@@ -0,0 +1,16 @@
+import polars as pl
+
+# Mapa de tipos Python -> dtypes de Polars, compartido por los writers que
+# reciben listas de dicts: un solo lugar evita que el mapa derive entre módulos
+_PY_DTYPES = {bool: pl.Boolean, int: pl.Int64, float: pl.Float64, str: pl.Utf8}
+
+
+def schema_de_lista(rows):
+    """
+    Deriva el esquema explícito de una lista de dicts mirando solo la primera
+    fila, para que pl.DataFrame se salte la pasada de inferencia sobre todas
+    las filas. Devuelve None si aparece un tipo sin mapear (el caller recae en
+    la inferencia normal).
+    """
+    schema = {k: _PY_DTYPES.get(type(v)) for k, v in rows[0].items()}
+    return schema if all(schema.values()) else None
@@ -1,135 +1,364 @@
-import threading
-from concurrent.futures import ThreadPoolExecutor
-from collections import defaultdict
-
-class PipelineEngine:
-    """
-    Motor de ejecución de pipelines tipo DAG.
-
-    Características:
-    - Siempre requiere un nodo de entrada (entry_name).
-    - Nodo de entrada puede ejecutarse sin inputs iniciales.
-    - Soporta nodos con múltiples inputs (required_inputs).
-    - Maneja defer_output y finalize().
-    - Mantiene paralelismo usando ThreadPoolExecutor.
-    """
-    def __init__(self, max_workers=5):
-        self.nodes = {}
-        self.max_workers = max_workers
-        self.logger = None
-        self.node_input_buffer = defaultdict(dict)
-        self.lock = threading.Lock()
-
-    def add_node(self, node):
-        self.nodes[node.name] = node
-
-    def run_node(self, node, input_name=None, input_value=None):
-        """
-        Ejecuta un nodo cuando tiene todos los inputs necesarios.
-        """
-        with self.lock:
-            required = getattr(node, "required_inputs", None)
-
-            # Guardamos input si viene de otro nodo
-            if input_name is not None:
-                self.node_input_buffer[node.name][input_name] = input_value
-
-            # Nodo sin inputs o ya tiene todos sus inputs requeridos
-            if not required:
-                # Nodo sin inputs recibe None o dict con un solo input
-                run_inputs = {} if input_name is None else {input_name: input_value}
-                execute = True
-            else:
-                execute = all(k in self.node_input_buffer[node.name] for k in required)
-                if execute:
-                    run_inputs = {k: self.node_input_buffer[node.name][k] for k in required}
-                else:
-                    return  # aún faltan inputs, esperamos
-
-        # Ejecutar nodo
-        if execute:
-            if self.logger:
-                self.logger.info(f"[NODE_START] Ejecutando nodo: {node.name}")
-                self.logger.info(f"[NODE_INPUT - {node.name}]: {run_inputs}")
-
-            result = node.run(run_inputs if required else None)
-
-            if self.logger:
-                self.logger.info(f"[NODE_OUTPUT - {node.name}]: {result}")
-
-            # Limpiar buffer del nodo
-            self.node_input_buffer[node.name].clear()
-
-            # Manejo de defer_output
-            if result is None:
-                if getattr(node, "defer_output", False):
-                    if self.logger:
-                        self.logger.info(f"[{node.name}] Salida diferida. Se ejecutará en finalize().")
-                    return
-                else:
-                    if self.logger:
-                        self.logger.info(f"[{node.name}] No devolvió resultados. Rama detenida.")
-                    return
-
-            # Propagar outputs a nodos hijos
-            for output_node in node.outputs:
-                if isinstance(result, list):
-                    # Cada elemento debe ser tuple (input_name, value) para nodo hijo
-                    with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-                        for item in result:
-                            executor.submit(self.run_node, output_node, item[0], item[1])
-                elif isinstance(result, dict):
-                    # Cada clave será input_name para nodo hijo
-                    for k, v in result.items():
-                        self.run_node(output_node, k, v)
-                else:
-                    # Valor simple para nodo hijo sin requerir nombre
-                    self.run_node(output_node, None, result)
-
-    def run(self, entry_name, input_data=None, wait=True):
-        """
-        Inicia la ejecución del pipeline.
-
-        Args:
-            entry_name (str): Nodo de entrada obligatorio.
-            input_data (dict): Datos iniciales para el nodo de entrada. Puede ser None.
-            wait (bool): Esperar a que termine el pipeline antes de continuar.
-        """
-        node = self.nodes[entry_name]
-
-        for n in self.nodes.values():
-            n.logger = self.logger
-
-        if self.logger:
-            self.logger.info(f"[RUN_START] Flujo iniciado desde nodo: {entry_name}")
-
-        threads = []
-
-        # Ejecutar nodo de entrada con input_data
-        if input_data:
-            for k, v in input_data.items():
-                t = threading.Thread(target=self.run_node, args=(node, k, v), name=f"{entry_name}-{k}")
-                t.start()
-                threads.append(t)
-                
-        else:
-            # No hay inputs, ejecutar nodo de entrada con None
-            t = threading.Thread(target=self.run_node, args=(node,), name=entry_name)
-            t.start()
-            threads.append(t)
-
-        if wait:
-            for t in threads:
-                t.join()
-
-            # Ejecutar nodos con finalize
-            for node in self.nodes.values():
-                if hasattr(node, "finalize"):
-                    final_output = node.finalize()
-                    if final_output:
-                        for output_node in node.outputs:
-                            for k, v in final_output.items():
-                                self.run_node(output_node, k, v)
-
-        if self.logger:
-            self.logger.info("[RUN_COMPLETE] Ejecución del pipeline completada")
+import ast
+import sys
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait as futures_wait
+from collections import defaultdict
+
+# Fusionar filter(c1).filter(c2) en filter(c1 & c2) solo es seguro si las
+# condiciones son puramente elementwise: un agregado, ventana u operación que
+# dependa del frame completo (mean, sum, over, shift, head, ...) vería un
+# frame distinto tras la fusión. En vez de listar lo prohibido, se admite
+# únicamente este vocabulario de operaciones por fila; cualquier atributo
+# fuera de la lista bloquea la fusión.
+_ELEMENTWISE = frozenset({
+    # constructores y namespaces
+    "col", "lit", "str", "dt",
+    # operaciones por fila sobre expresiones
+    "alias", "cast", "abs", "round", "floor", "ceil", "not_",
+    "is_null", "is_not_null", "is_nan", "is_not_nan", "is_finite", "is_infinite",
+    "is_in", "is_between", "fill_null", "fill_nan",
+    "and_", "or_", "xor",
+    # métodos str/dt habituales en condiciones
+    "contains", "starts_with", "ends_with", "to_lowercase", "to_uppercase",
+    "strip_chars", "len_chars", "to_date", "to_datetime",
+    "year", "month", "day", "weekday", "hour", "minute", "second",
+})
+
+
+def _condicion_fusionable(condition_str):
+    """
+    Determina por AST si una condición de filtro es puramente elementwise y,
+    por tanto, segura de fusionar con un AND.
+    """
+    try:
+        tree = ast.parse(condition_str, mode="eval")
+    except SyntaxError:
+        return False
+    return all(
+        n.attr in _ELEMENTWISE
+        for n in ast.walk(tree)
+        if isinstance(n, ast.Attribute)
+    )
+
+
+def _summarize(value):
+    """
+    Representación barata de un valor para las líneas de log del motor: el
+    __repr__ completo de un DataFrame renderiza una tabla formateada, que en
+    frames grandes cuesta más que el propio nodo. Polars se consulta vía
+    sys.modules para no arrastrarlo al importar el motor.
+    """
+    pl = sys.modules.get("polars")
+    if pl is not None:
+        if isinstance(value, pl.DataFrame):
+            return f"<DataFrame shape={value.shape}>"
+        if isinstance(value, pl.LazyFrame):
+            return "<LazyFrame>"
+    if isinstance(value, dict):
+        return {k: _summarize(v) for k, v in value.items()}
+    return value
+
+class PipelineEngine:
+    """
+    Motor de ejecución de pipelines tipo DAG.
+
+    Características:
+    - Siempre requiere un nodo de entrada (entry_name).
+    - Nodo de entrada puede ejecutarse sin inputs iniciales.
+    - Soporta nodos con múltiples inputs (required_inputs).
+    - Maneja defer_output y finalize().
+    - Mantiene paralelismo usando ThreadPoolExecutor.
+    """
+    def __init__(self, max_workers=5):
+        self.nodes = {}
+        self.max_workers = max_workers
+        self.logger = None
+        self.node_input_buffer = defaultdict(dict)
+        self.lock = threading.Lock()
+        # Pool persistente: crear un ThreadPoolExecutor por propagación
+        # levantaba hilos de kernel nuevos en cada fan-out del DAG
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        # Futures en vuelo de los despachos por lista: se drenan en run()
+        # antes de finalize(), en vez de bloquear cada fan-out
+        self._pending_futures = []
+        self._futures_lock = threading.Lock()
+
+    def close(self):
+        """Libera el pool de hilos del motor."""
+        self.executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+    def add_node(self, node):
+        self.nodes[node.name] = node
+
+    def _optimize_dag(self):
+        """
+        Pasada de optimización previa a la ejecución: empuja condiciones de
+        FilterNode hacia los lectores que las soportan.
+
+        Si un lector marca `supports_predicate_pushdown` y su único hijo es un
+        FilterNode con una sola entrada, la condición compilada se adjunta a
+        `config["predicate"]` del lector (que la aplica sobre su scan lazy,
+        dejando que Polars la empuje hasta el archivo) y el FilterNode se
+        puentea del DAG: las filas descartadas nunca se materializan.
+        """
+        from src.modulos.Utility_Module import FilterNode, _compile_condition
+
+        # 1) Fusionar cadenas FilterNode → FilterNode en un solo AND: un solo
+        # plan y un solo dispatch de kernel por tramo de filtros consecutivos
+        fusionado = True
+        while fusionado:
+            fusionado = False
+            for node in list(self.nodes.values()):
+                if not isinstance(node, FilterNode) or len(node.outputs) != 1:
+                    continue
+                hijo = node.outputs[0]
+                if (
+                    not isinstance(hijo, FilterNode)
+                    or hijo.inputs != [node]
+                    or node.defer_output or hijo.defer_output
+                    or node.config.get("salida", "data") != "data"
+                ):
+                    continue
+
+                c1 = node.config.get("condition")
+                c2 = hijo.config.get("condition")
+                if not c1 or not c2:
+                    continue
+                if not (_condicion_fusionable(c1) and _condicion_fusionable(c2)):
+                    continue
+
+                node.config["condition"] = f"({c1}) & ({c2})"
+                node.config["salida"] = hijo.config.get("salida", "data")
+                node._salida = node.config["salida"]
+
+                # Re-cablear: node hereda los consumidores del hijo
+                node.outputs = []
+                for nieto in hijo.outputs:
+                    if hijo in nieto.inputs:
+                        nieto.inputs.remove(hijo)
+                    node.add_output(nieto)
+                self.nodes.pop(hijo.name, None)
+
+                if self.logger:
+                    self.logger.info(
+                        f"[OPTIMIZE] Filtros '{node.name}' y '{hijo.name}' fusionados en un solo predicado"
+                    )
+                fusionado = True
+                break
+
+        # 2) Empujar predicados de FilterNode hacia los lectores
+        for node in list(self.nodes.values()):
+            if not getattr(node, "supports_predicate_pushdown", False):
+                continue
+            # En chunk_mode el lector aplica el predicado antes del slice,
+            # mientras que el FilterNode puenteado corría después del chunk:
+            # empujarlo cambiaría qué filas caen en cada parte
+            if node.config.get("chunk_mode", False):
+                continue
+            # Solo si el FilterNode es el ÚNICO consumidor del lector: con
+            # fan-out, el predicado filtraría también las ramas que no pasan
+            # por el filtro, y dos filtros hermanos se pisarían el predicate
+            if len(node.outputs) != 1:
+                continue
+            hijo = node.outputs[0]
+            if not isinstance(hijo, FilterNode) or len(hijo.inputs) != 1:
+                continue
+            # Solo si el bypass no cambia el nombre del input que reciben
+            # los nietos
+            if hijo.config.get("salida", "data") != node.config.get("salida", "data"):
+                continue
+
+            condition_str = hijo.config.get("condition")
+            if not condition_str:
+                continue
+            try:
+                predicate = _compile_condition(condition_str)
+            except Exception:
+                continue  # condición inválida: que falle en el FilterNode
+
+            node.config["predicate"] = predicate
+
+            # Re-cablear: lector → nietos, sacando el FilterNode del DAG
+            node.outputs.remove(hijo)
+            for nieto in hijo.outputs:
+                if hijo in nieto.inputs:
+                    nieto.inputs.remove(hijo)
+                node.add_output(nieto)
+            self.nodes.pop(hijo.name, None)
+
+            if self.logger:
+                self.logger.info(
+                    f"[OPTIMIZE] Predicado de '{hijo.name}' empujado al lector '{node.name}'"
+                )
+
+    def run_node(self, node, input_name=None, input_value=None):
+        """
+        Ejecuta un nodo cuando tiene todos los inputs necesarios.
+        """
+        # Lock por nodo: solo serializa las llegadas a ESTE nodo, las ramas
+        # paralelas del DAG no contienden entre sí
+        with node._buffer_lock:
+            required = getattr(node, "required_inputs", None)
+            buf = self.node_input_buffer[node.name]
+
+            # Guardamos input si viene de otro nodo
+            if input_name is not None:
+                buf[input_name] = input_value
+
+            # Nodo sin inputs o ya tiene todos sus inputs requeridos
+            if not required:
+                # Nodo sin inputs recibe None o dict con un solo input
+                run_inputs = {} if input_name is None else {input_name: input_value}
+                execute = True
+            else:
+                execute = all(k in buf for k in required)
+                if execute:
+                    run_inputs = {k: buf[k] for k in required}
+                else:
+                    return  # aún faltan inputs, esperamos
+
+        # Ejecutar nodo
+        if execute:
+            # Guard único: si INFO está filtrado no se paga ni el formateo ni
+            # el resumen de los frames
+            log_info = self.logger is not None and self.logger.isEnabledFor(logging.INFO)
+
+            if log_info:
+                self.logger.info("[NODE_START] Ejecutando nodo: %s", node.name)
+                self.logger.info("[NODE_INPUT - %s]: %s", node.name, _summarize(run_inputs))
+
+            result = node.run(run_inputs if required else None)
+
+            if log_info:
+                self.logger.info("[NODE_OUTPUT - %s]: %s", node.name, _summarize(result))
+
+            # Limpiar buffer del nodo
+            buf.clear()
+
+            # Manejo de defer_output
+            if result is None:
+                if node.defer_output:
+                    if log_info:
+                        self.logger.info("[%s] Salida diferida. Se ejecutará en finalize().", node.name)
+                    return
+                else:
+                    if log_info:
+                        self.logger.info("[%s] No devolvió resultados. Rama detenida.", node.name)
+                    return
+
+            # Fast path: un frame pelado es la salida única del nodo y se
+            # despacha bajo su 'salida' configurada, sin dict intermedio
+            pl = sys.modules.get("polars")
+            if pl is not None and isinstance(result, (pl.DataFrame, pl.LazyFrame)):
+                salida = getattr(node, "_salida", "data")
+                for output_node in node.outputs:
+                    self.run_node(output_node, salida, result)
+                return
+
+            # Propagar outputs a nodos hijos
+            for output_node in node.outputs:
+                if isinstance(result, list):
+                    # Cada elemento debe ser tuple (input_name, value) para nodo hijo;
+                    # se despachan al pool compartido sin bloquear este hilo:
+                    # cualquier worker libre toma el siguiente lote listo y el
+                    # join global ocurre en run() antes de finalize()
+                    futures = [
+                        self.executor.submit(self.run_node, output_node, item[0], item[1])
+                        for item in result
+                    ]
+                    with self._futures_lock:
+                        self._pending_futures.extend(futures)
+                elif isinstance(result, dict):
+                    # Cada clave será input_name para nodo hijo
+                    for k, v in result.items():
+                        self.run_node(output_node, k, v)
+                else:
+                    # Valor simple para nodo hijo sin requerir nombre
+                    self.run_node(output_node, None, result)
+
+    def run(self, entry_name, input_data=None, wait=True):
+        """
+        Inicia la ejecución del pipeline.
+
+        Args:
+            entry_name (str): Nodo de entrada obligatorio.
+            input_data (dict): Datos iniciales para el nodo de entrada. Puede ser None.
+            wait (bool): Esperar a que termine el pipeline antes de continuar.
+        """
+        self._optimize_dag()
+
+        node = self.nodes[entry_name]
+
+        for n in self.nodes.values():
+            n.logger = self.logger
+
+        # Preparación única: validación de config y compilación de
+        # expresiones fuera del camino caliente de run_node
+        for n in self.nodes.values():
+            n.prepare()
+
+        if self.logger:
+            self.logger.info(f"[RUN_START] Flujo iniciado desde nodo: {entry_name}")
+
+        threads = []
+
+        # Ejecutar nodo de entrada con input_data
+        if input_data:
+            for k, v in input_data.items():
+                t = threading.Thread(target=self.run_node, args=(node, k, v), name=f"{entry_name}-{k}")
+                t.start()
+                threads.append(t)
+                
+        else:
+            # No hay inputs, ejecutar nodo de entrada con None
+            t = threading.Thread(target=self.run_node, args=(node,), name=entry_name)
+            t.start()
+            threads.append(t)
+
+        if wait:
+            for t in threads:
+                t.join()
+
+            # Drenar los despachos en vuelo: cada lote puede encolar lotes
+            # nuevos, así que se espera hasta que no quede nada pendiente
+            while True:
+                with self._futures_lock:
+                    pendientes = self._pending_futures
+                    self._pending_futures = []
+                if not pendientes:
+                    break
+                futures_wait(pendientes)
+
+            # Ejecutar nodos con finalize
+            for node in self.nodes.values():
+                if hasattr(node, "finalize"):
+                    final_output = node.finalize()
+                    if final_output:
+                        for output_node in node.outputs:
+                            for k, v in final_output.items():
+                                self.run_node(output_node, k, v)
+
+        if self.logger:
+            self.logger.info("[RUN_COMPLETE] Ejecución del pipeline completada")
+
+    async def run_async(self, entry_name, input_data=None):
+        """
+        Fachada asíncrona de run(): ejecuta el pipeline completo en un hilo
+        del loop (asyncio.to_thread) para poder await-earlo desde una
+        aplicación async sin bloquear el event loop.
+
+        El scheduler real sigue siendo el pool de hilos compartido: los nodos
+        son llamadas síncronas de Polars que liberan el GIL, así que un loop
+        cooperativo por nodo no aportaría solapamiento adicional.
+        """
+        import asyncio
+
+        await asyncio.to_thread(self.run, entry_name, input_data, True)
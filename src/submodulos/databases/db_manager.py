@@ -1,9 +1,27 @@
+import io
 import os
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterator
 
+import polars as pl
 from sqlalchemy import create_engine, text
 from sqlalchemy.exc import SQLAlchemyError
 
+# Engines compartidos por URL: cada create_engine levanta su propio pool de
+# conexiones, y varios nodos de DB contra la misma base lo multiplicarían
+_ENGINES: Dict[str, Any] = {}
+
+
+def _get_engine(url: str):
+    """Devuelve el engine cacheado para la URL, creándolo la primera vez."""
+    engine = _ENGINES.get(url)
+    if engine is None:
+        # pool_pre_ping descarta conexiones muertas del pool con un ping
+        # barato antes de entregarlas
+        engine = create_engine(url, echo=False, pool_pre_ping=True, future=True)
+        _ENGINES[url] = engine
+    return engine
+
+
 class DatabaseManager:
     """
     Esta clase es para la gestión de la conectividad y operación con las 
@@ -43,7 +61,7 @@ class DatabaseManager:
         self.config = config
         self.db_type = self.config.get("db_type", "").lower()
         url = self._build_url_conn(host, port, database, user, password)
-        self.engine = create_engine(url, echo=False)
+        self.engine = _get_engine(url)
         self.logger = None
 
     def _build_url_conn(
@@ -75,11 +93,58 @@ class DatabaseManager:
         """
         Realiza el bulk de un datafrema de pandas hacia una tabla en especifica
 
+        En PostgreSQL el frame viaja por COPY FROM STDIN (sin parseo de SQL
+        por fila); en MySQL se agrupan INSERTs multi-fila. El resto de los
+        backends conserva el to_sql fila a fila original.
+
         Args:
             table: nombre de la tabla donde se realizara el bulk.
-            data: dataframe de pandas. 
+            data: dataframe de pandas.
+        """
+        if self.db_type == 'postgresql':
+            buf = io.StringIO()
+            data.to_csv(buf, index=False, header=False)
+            buf.seek(0)
+            self.copy_from_csv(table, list(data.columns), buf)
+        elif self.db_type == 'mysql':
+            data.to_sql(table, self.engine, if_exists="append", index=False,
+                        method="multi", chunksize=1000)
+        else:
+            data.to_sql(table, self.engine, if_exists="append", index=False)
+
+    def copy_from_csv(self, table: str, columns: List[str], buffer) -> None:
+        """
+        Carga masiva vía COPY FROM STDIN (solo PostgreSQL).
+
+        COPY evita el parseo/planificación de SQL por fila del INSERT, por lo
+        que es el camino más rápido para bulk loads grandes.
+
+        Args:
+            table: Nombre de la tabla destino.
+            columns: Columnas en el orden del CSV.
+            buffer: File-like con el contenido CSV (sin cabecera).
+
+        Raises:
+            ValueError: Si la base de datos no es PostgreSQL.
         """
-        data.to_sql(table, self.engine, if_exists="append", index=False)
+        if self.db_type != 'postgresql':
+            raise ValueError("COPY FROM STDIN solo está soportado para PostgreSQL")
+
+        raw = self.engine.raw_connection()
+        try:
+            cur = raw.cursor()
+            cur.copy_expert(
+                f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT CSV)",
+                buffer,
+            )
+            raw.commit()
+        except Exception as e:
+            raw.rollback()
+            if self.logger:
+                self.logger.error(f"Error en COPY hacia {table}: {e}")
+            raise
+        finally:
+            raw.close()
 
     def execute_query(
         self,
@@ -94,7 +159,7 @@ class DatabaseManager:
             params: Diccionario de parametros para la parametrización del query.
 
         Returns:
-            Lista de dictionarios representados por rows, or None si no se tiene resultados.
+            Lista de dictionarios representados por rows, vacía si no se tiene resultados.
 
         Raises:
             SQLAlchemyError: On query execution failure.
@@ -104,28 +169,82 @@ class DatabaseManager:
                 result = conn.execute(text(query), params or {})
                 if result.returns_rows:
                     return [dict(row._mapping) for row in result]
-                return None
+                return []
         except SQLAlchemyError as e:
             self.logger.error(f"Error de ejecución del Query: {e}")
             raise
 
-    def select(
+    def select_df(
         self,
         query: str,
         params: Optional[Dict[str, Any]] = None
-    ) -> List[Dict[str, Any]]:
+    ) -> pl.DataFrame:
         """
-        Ejecuta un SELECT query.
+        Ejecuta un SELECT y retorna un DataFrame de Polars columnar.
+
+        A diferencia de execute_query, no materializa un dict por fila
+        (N·M inserciones de hash para resultados grandes): las filas crudas
+        del driver pasan a columnas contiguas en una sola construcción.
 
         Args:
             query: SQL SELECT query.
-            params: Parameters for the query.
+            params: Diccionario de parametros para la parametrización del query.
 
         Returns:
-            Lista de resultados rows como diccionarios.
+            DataFrame con las columnas del resultado (vacío si no hay filas).
+
+        Raises:
+            SQLAlchemyError: On query execution failure.
+        """
+        try:
+            with self.engine.connect() as conn:
+                result = conn.execute(text(query), params or {})
+                cols = list(result.keys())
+                rows = result.fetchall()
+            return pl.DataFrame(rows, schema=cols, orient="row")
+        except SQLAlchemyError as e:
+            self.logger.error(f"Error de ejecución del Query columnar: {e}")
+            raise
+
+    def iter_query(
+        self,
+        query: str,
+        params: Optional[Dict[str, Any]] = None,
+        chunk_size: int = 1000
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Ejecuta un SELECT en streaming y genera las filas como diccionarios.
+
+        Usa stream_results/yield_per para que el driver traiga las filas en
+        particiones de chunk_size (cursor de servidor en PostgreSQL), sin
+        retener el resultado completo en memoria como execute_query.
+
+        Args:
+            query: SQL SELECT query.
+            params: Diccionario de parametros para la parametrización del query.
+            chunk_size: Filas por partición traída del servidor.
+
+        Yields:
+            Dict por fila del resultado.
+
+        Raises:
+            SQLAlchemyError: On query execution failure.
         """
-        result = self.execute_query(query, params)
-        return result if result else []
+        try:
+            with self.engine.connect().execution_options(
+                stream_results=True, yield_per=chunk_size
+            ) as conn:
+                result = conn.execute(text(query), params or {})
+                for partition in result.partitions():
+                    for row in partition:
+                        yield dict(row._mapping)
+        except SQLAlchemyError as e:
+            self.logger.error(f"Error de ejecución del Query en streaming: {e}")
+            raise
+
+    # Alias directo: execute_query ya retorna lista vacía sin filas, así que
+    # el wrapper solo agregaba un frame de Python por consulta
+    select = execute_query
 
     def execute_dml(
         self,
@@ -154,53 +273,40 @@ class DatabaseManager:
             self.logger.error(f"DML execution failed: {e}")
             raise
 
-    def insert(
-        self,
-        query: str,
-        params: Optional[Dict[str, Any]] = None
-    ) -> int:
-        """
-        Ejecuta un INSERT query.
-
-        Args:
-            query: SQL INSERT query.
-            params: Parametros de la query.
-
-        Returns:
-            Numero de filas afectadas.
-        """
-        return self.execute_dml(query, params)
+    # Aliases directos de execute_dml (INSERT/UPDATE/DELETE comparten la
+    # misma ejecución transaccional); se evita un frame por llamada
+    insert = execute_dml
+    update = execute_dml
+    delete = execute_dml
 
-    def update(
+    def insert_many(
         self,
         query: str,
-        params: Optional[Dict[str, Any]] = None
+        params_list: List[Dict[str, Any]]
     ) -> int:
         """
-        Ejecuta un UPDATE query.
+        Ejecuta un INSERT parametrizado para un lote de filas vía executemany.
 
-        Args:
-            query: SQL UPDATE query.
-            params: Parametros de la query.
-
-        Returns:
-            Numero de filas afectadas.
-        """
-        return self.execute_dml(query, params)
-
-    def delete(
-        self,
-        query: str,
-        params: Optional[Dict[str, Any]] = None
-    ) -> int:
-        """
-        Ejecuta un DELETE query.
+        El statement se prepara una sola vez y el driver envía el lote
+        completo, en vez de un round-trip y un parseo de SQL por fila.
 
         Args:
-            query: SQL DELETE query.
-            params: Parametros de la query.
+            query: SQL INSERT query.
+            params_list: Lista de diccionarios, uno por fila.
 
         Returns:
             Numero de filas afectadas.
+
+        Raises:
+            SQLAlchemyError: On execution failure (transaction rolled back).
         """
-        return self.execute_dml(query, params)
\ No newline at end of file
+        if not params_list:
+            return 0
+        try:
+            with self.engine.connect() as conn:
+                with conn.begin():
+                    result = conn.execute(text(query), params_list)
+                    return result.rowcount
+        except SQLAlchemyError as e:
+            self.logger.error(f"Error de ejecución del insert por lotes: {e}")
+            raise
\ No newline at end of file
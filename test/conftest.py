@@ -0,0 +1,17 @@
+import logging
+
+import pytest
+
+
+@pytest.fixture(scope="session")
+def mock_logger():
+    """
+    Logger silencioso compartido por todos los tests: con NullHandler y nivel
+    CRITICAL, isEnabledFor corta en un compare entero antes de formatear
+    cualquier mensaje, sin el costo por llamada de un DummyLogger en Python.
+    """
+    logger = logging.getLogger("test.pipeline")
+    logger.addHandler(logging.NullHandler())
+    logger.setLevel(logging.CRITICAL)
+    logger.propagate = False
+    return logger
@@ -1,18 +1,10 @@
+import json
 import pytest
 import polars as pl
 from unittest.mock import patch, MagicMock
 from src.modulos.API_Module import APIReaderNode
 
 
-@pytest.fixture
-def mock_logger():
-    """Mock simple para reemplazar el logger en el nodo."""
-    class DummyLogger:
-        def info(self, msg): pass
-        def error(self, msg): pass
-    return DummyLogger()
-
-
 @pytest.fixture
 def base_config():
     """Configuración base simulada para el nodo."""
@@ -25,12 +17,12 @@ def base_config():
 
 
 # llamada exitosa
-@patch("src.modulos.API_Module.requests.get")
+@patch("src.modulos.API_Module.APIReaderNode._session.get")
 def test_api_reader_success(mock_get, mock_logger, base_config):
     fake_json = [{"a": 1, "b": 2}]
     mock_response = MagicMock()
     mock_response.status_code = 200
-    mock_response.json.return_value = fake_json
+    mock_response.content = json.dumps(fake_json).encode()
     mock_get.return_value = mock_response
 
     node = APIReaderNode("TestNode", base_config)
@@ -47,13 +39,13 @@ def test_api_reader_success(mock_get, mock_logger, base_config):
 
 
 # llamada exitosa con campos seleccionados
-@patch("src.modulos.API_Module.requests.get")
+@patch("src.modulos.API_Module.APIReaderNode._session.get")
 def test_api_reader_with_selected(mock_get, mock_logger, base_config):
     base_config["selected"] = ["a"]
     fake_json = [{"a": 1, "b": 2}]
     mock_response = MagicMock()
     mock_response.status_code = 200
-    mock_response.json.return_value = fake_json
+    mock_response.content = json.dumps(fake_json).encode()
     mock_get.return_value = mock_response
 
     node = APIReaderNode("TestNode", base_config)
@@ -66,26 +58,77 @@ def test_api_reader_with_selected(mock_get, mock_logger, base_config):
     assert df["a"][0] == 1
 
 
-# manejo de error 429 Too Many Requests
-@patch("src.modulos.API_Module.requests.get")
+# varias URLs en paralelo
+@patch("src.modulos.API_Module.APIReaderNode._session.get")
+def test_api_reader_multiple_urls(mock_get, mock_logger, base_config):
+    base_config.pop("api_url")
+    base_config["api_urls"] = ["https://fake.api/a", "https://fake.api/b"]
+
+    def fake_get(url, params=None, timeout=None):
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        valor = 1 if url.endswith("/a") else 2
+        mock_response.content = json.dumps([{"a": valor}]).encode()
+        return mock_response
+
+    mock_get.side_effect = fake_get
+
+    node = APIReaderNode("TestNode", base_config)
+    node.logger = mock_logger
+
+    result = node.run()
+    df = result["data"]
+
+    assert isinstance(df, pl.DataFrame)
+    assert df["a"].to_list() == [1, 2]
+
+
+# manejo de error 429 Too Many Requests: reintentos acotados con Retry-After
+@patch("src.modulos.API_Module.APIReaderNode._session.get")
 @patch("src.modulos.API_Module.time.sleep", return_value=None)
 def test_api_reader_too_many_requests(mock_sleep, mock_get, mock_logger, base_config):
+    base_config["max_retries"] = 3
     mock_response = MagicMock()
     mock_response.status_code = 429
-    mock_response.headers = {"Retry-After": "1"}
+    mock_response.headers = {"Retry-After": "7"}
     mock_get.return_value = mock_response
 
     node = APIReaderNode("TestNode", base_config)
     node.logger = mock_logger
 
-    # Patch recursivo: evita llamada real a run() otra vez
-    with patch.object(APIReaderNode, "run", return_value="retry") as mock_run:
+    with pytest.raises(RuntimeError, match="429"):
         node.run()
-        mock_run.assert_called()
+
+    # Un GET por intento, y la espera respeta el Retry-After de la respuesta
+    assert mock_get.call_count == 3
+    assert mock_sleep.call_count == 3
+    assert all(call.args[0] == 7 for call in mock_sleep.call_args_list)
+
+
+# tras un 429, una respuesta exitosa corta el bucle de reintentos
+@patch("src.modulos.API_Module.APIReaderNode._session.get")
+@patch("src.modulos.API_Module.time.sleep", return_value=None)
+def test_api_reader_recovers_after_429(mock_sleep, mock_get, mock_logger, base_config):
+    saturada = MagicMock()
+    saturada.status_code = 429
+    saturada.headers = {}
+    exitosa = MagicMock()
+    exitosa.status_code = 200
+    exitosa.content = json.dumps([{"a": 1}]).encode()
+    mock_get.side_effect = [saturada, exitosa]
+
+    node = APIReaderNode("TestNode", base_config)
+    node.logger = mock_logger
+
+    result = node.run()
+
+    assert result["data"]["a"][0] == 1
+    assert mock_get.call_count == 2
+    assert mock_sleep.call_count == 1
 
 
 # manejo de excepciones
-@patch("src.modulos.API_Module.requests.get", side_effect=Exception("Connection error"))
+@patch("src.modulos.API_Module.APIReaderNode._session.get", side_effect=Exception("Connection error"))
 def test_api_reader_exception(mock_get, mock_logger, base_config):
     node = APIReaderNode("TestNode", base_config)
     node.logger = mock_logger
@@ -13,16 +13,6 @@ def tmp_csv(tmp_path):
     return file_path
 
 
-@pytest.fixture
-def mock_logger():
-    """Logger dummy para silenciar logs en test."""
-    class DummyLogger:
-        def info(self, msg): pass
-        def debug(self, msg): pass
-        def exception(self, msg): pass
-    return DummyLogger()
-
-
 ################### TESTS del nodo de Lectura ########################
 
 def test_csv_reader_single_file(tmp_csv, mock_logger):
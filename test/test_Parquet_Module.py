@@ -1,20 +1,9 @@
 import pytest
 import polars as pl
-from unittest.mock import patch
+from unittest.mock import patch, MagicMock
 from src.modulos.Parquet_Module import ParquetReaderNode, ParquetWriterNode
 
 
-# Mock logger simple - Para no generar logs reales
-def mock_logger():
-    class DummyLogger:
-        def info(self, msg): pass
-        def debug(self, msg): pass
-        def warning(self, msg): pass
-        def error(self, msg): pass
-        def exception(self, msg): pass
-    return DummyLogger()
-
-
 ######################### Test de Lectura ######################################
 
 def test_parquet_reader_missing_config():
@@ -23,19 +12,17 @@ def test_parquet_reader_missing_config():
         node.run()
 
 
-@patch("src.modulos.Parquet_Module.os.path.exists", return_value=False)
-def test_parquet_reader_file_not_found(mock_exists):
+def test_parquet_reader_file_not_found():
     config = {"file_paths": ["nonexistent.parquet"]}
     node = ParquetReaderNode("Reader", config)
     with pytest.raises(RuntimeError, match="leyendo archivo Parquet"):
         node.run()
 
 
-@patch("src.modulos.Parquet_Module.pl.read_parquet")
-@patch("src.modulos.Parquet_Module.os.path.exists", return_value=True)
-def test_parquet_reader_basic(mock_exists, mock_read, tmp_path):
+@patch("src.modulos.Parquet_Module.pl.scan_parquet")
+def test_parquet_reader_basic(mock_scan, tmp_path):
     df_mock = pl.DataFrame({"a": [1, 2, 3]})
-    mock_read.return_value = df_mock
+    mock_scan.return_value = df_mock.lazy()
     file = tmp_path / "sample.parquet"
     file.touch()
 
@@ -68,28 +55,29 @@ def test_parquet_writer_dict_input(mock_write, tmp_path):
     assert "output_path" in result
 
 
-def test_parquet_writer_invalid_type():
+def test_parquet_writer_invalid_type(mock_logger):
     node = ParquetWriterNode("Writer", {"file_path": "invalid"})
-    node.logger = mock_logger()
+    node.logger = mock_logger
     with pytest.raises(RuntimeError, match="Tipo de entrada no soportado"):
         node.run({"data": "not_a_dataframe"})
 
 
-@patch("src.modulos.Parquet_Module.pl.read_parquet")
+@patch("src.modulos.Parquet_Module.os.replace")
+@patch("src.modulos.Parquet_Module.pl.scan_parquet")
 @patch("src.modulos.Parquet_Module.pl.concat")
-@patch("src.modulos.Parquet_Module.pl.DataFrame.write_parquet")
 @patch("src.modulos.Parquet_Module.os.path.exists", return_value=True)
-def test_parquet_writer_append_mode(mock_exists, mock_write, mock_concat, mock_read, tmp_path):
+def test_parquet_writer_append_mode(mock_exists, mock_concat, mock_scan, mock_replace, tmp_path, mock_logger):
     file = tmp_path / "append.parquet"
-    df_existing = pl.DataFrame({"a": [1]})
     df_new = pl.DataFrame({"a": [2]})
-    mock_read.return_value = df_existing
-    mock_concat.return_value = pl.DataFrame({"a": [1, 2]})
+    mock_scan.return_value = pl.DataFrame({"a": [1]}).lazy()
+    mock_concat.return_value = MagicMock()
 
     node = ParquetWriterNode("Writer", {"file_path": str(file), "mode": "a"})
-    node.logger = mock_logger()
+    node.logger = mock_logger
 
     result = node.run({"data": df_new})
     assert "output_path" in result
-    mock_read.assert_called_once_with(str(file))
+    mock_scan.assert_called_once_with(str(file))
     mock_concat.assert_called_once()
+    mock_concat.return_value.sink_parquet.assert_called_once()
+    mock_replace.assert_called_once()
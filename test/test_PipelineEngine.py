@@ -0,0 +1,156 @@
+import polars as pl
+import pytest
+
+from src.pipeline_engine.PipelineEngine import PipelineEngine, _condicion_fusionable
+from src.pipeline_engine.NodesEngine import BaseNode
+from src.modulos.CSV_Module import CSVReaderNode
+from src.modulos.Utility_Module import FilterNode
+
+
+class SinkNode(BaseNode):
+    """Nodo terminal que captura el frame recibido, para las aserciones."""
+    required_inputs = ["data"]
+
+    def __init__(self, name, config=None):
+        super().__init__(name, config)
+        self.recibido = None
+
+    def run(self, data):
+        self.recibido = data["data"]
+        return None
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / "datos.csv"
+    pl.DataFrame({"x": [1, 2, 3, 4, 5]}).write_csv(path)
+    return str(path)
+
+
+def _armar(*nodos):
+    engine = PipelineEngine()
+    for nodo in nodos:
+        engine.add_node(nodo)
+    return engine
+
+
+############### fusión de FilterNodes consecutivos ########################
+
+def test_fusion_filtros_consecutivos(csv_path):
+    lector = CSVReaderNode("lector", {"file_paths": [csv_path]})
+    f1 = FilterNode("f1", {"condition": 'pl.col("x") > 1'})
+    f2 = FilterNode("f2", {"condition": 'pl.col("x") < 5'})
+    sink = SinkNode("sink", {})
+    lector.add_output(f1)
+    f1.add_output(f2)
+    f2.add_output(sink)
+
+    with _armar(lector, f1, f2, sink) as engine:
+        engine.run("lector")
+
+    assert "f2" not in engine.nodes
+    assert sink.recibido["x"].to_list() == [2, 3, 4]
+
+
+def test_fusion_no_aplica_con_agregados(csv_path, tmp_path):
+    # filter(c1).filter(c2) != filter(c1 & c2) cuando c2 agrega sobre el frame
+    path = tmp_path / "agg.csv"
+    pl.DataFrame({"x": [1, 2, 3, 100]}).write_csv(path)
+
+    lector = CSVReaderNode("lector", {"file_paths": [str(path)]})
+    f1 = FilterNode("f1", {"condition": 'pl.col("x") < 100'})
+    f2 = FilterNode("f2", {"condition": 'pl.col("x") > pl.col("x").mean()'})
+    sink = SinkNode("sink", {})
+    lector.add_output(f1)
+    f1.add_output(f2)
+    f2.add_output(sink)
+
+    with _armar(lector, f1, f2, sink) as engine:
+        engine.run("lector")
+
+    assert sink.recibido["x"].to_list() == [3]
+
+
+def test_condicion_fusionable_rechaza_agregados():
+    assert _condicion_fusionable('pl.col("x") > 25')
+    for condicion in [
+        'pl.col("x") > pl.col("x").mean()',
+        'pl.col("x").sum() > 3',
+        'pl.col("x").shift(1) > 0',
+        '(pl.col("x") > 1).over("y")',
+    ]:
+        assert not _condicion_fusionable(condicion)
+
+
+############### pushdown de predicados hacia lectores ########################
+
+def test_pushdown_con_unico_consumidor(csv_path):
+    lector = CSVReaderNode("lector", {"file_paths": [csv_path]})
+    filtro = FilterNode("filtro", {"condition": 'pl.col("x") > 3'})
+    sink = SinkNode("sink", {})
+    lector.add_output(filtro)
+    filtro.add_output(sink)
+
+    with _armar(lector, filtro, sink) as engine:
+        engine.run("lector")
+
+    assert "filtro" not in engine.nodes
+    assert "predicate" in lector.config
+    assert sink.recibido["x"].to_list() == [4, 5]
+
+
+def test_pushdown_no_aplica_con_filtros_hermanos(csv_path):
+    # Dos filtros colgando del mismo lector: cada rama debe ver el frame
+    # completo, no el predicado de la otra
+    lector = CSVReaderNode("lector", {"file_paths": [csv_path]})
+    f_mayor = FilterNode("f_mayor", {"condition": 'pl.col("x") > 3'})
+    f_menor = FilterNode("f_menor", {"condition": 'pl.col("x") < 3'})
+    sink_mayor = SinkNode("sink_mayor", {})
+    sink_menor = SinkNode("sink_menor", {})
+    lector.add_output(f_mayor)
+    lector.add_output(f_menor)
+    f_mayor.add_output(sink_mayor)
+    f_menor.add_output(sink_menor)
+
+    with _armar(lector, f_mayor, f_menor, sink_mayor, sink_menor) as engine:
+        engine.run("lector")
+
+    assert "predicate" not in lector.config
+    assert sink_mayor.recibido["x"].to_list() == [4, 5]
+    assert sink_menor.recibido["x"].to_list() == [1, 2]
+
+
+def test_pushdown_no_aplica_con_consumidor_directo(csv_path):
+    # Un consumidor sin filtro colgando del lector debe recibir todas las filas
+    lector = CSVReaderNode("lector", {"file_paths": [csv_path]})
+    filtro = FilterNode("filtro", {"condition": 'pl.col("x") > 3'})
+    sink_filtrado = SinkNode("sink_filtrado", {})
+    sink_crudo = SinkNode("sink_crudo", {})
+    lector.add_output(filtro)
+    lector.add_output(sink_crudo)
+    filtro.add_output(sink_filtrado)
+
+    with _armar(lector, filtro, sink_filtrado, sink_crudo) as engine:
+        engine.run("lector")
+
+    assert "predicate" not in lector.config
+    assert sink_crudo.recibido["x"].to_list() == [1, 2, 3, 4, 5]
+    assert sink_filtrado.recibido["x"].to_list() == [4, 5]
+
+
+def test_pushdown_no_aplica_en_chunk_mode(csv_path):
+    # En chunk_mode el filtro corre después del slice; empujarlo cambiaría
+    # qué filas caen en el chunk
+    lector = CSVReaderNode("lector", {
+        "file_paths": [csv_path], "chunk_mode": True, "chunksize": 3, "part_chunk": 0,
+    })
+    filtro = FilterNode("filtro", {"condition": 'pl.col("x") >= 2'})
+    sink = SinkNode("sink", {})
+    lector.add_output(filtro)
+    filtro.add_output(sink)
+
+    with _armar(lector, filtro, sink) as engine:
+        engine.run("lector")
+
+    assert "predicate" not in lector.config
+    assert sink.recibido["x"].to_list() == [2, 3]
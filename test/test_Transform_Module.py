@@ -8,23 +8,14 @@ from src.modulos.Transform_Module import (
 )
 
 
-class DummyLogger:
-    def __init__(self):
-        self.logs = []
-    def info(self, msg): self.logs.append(("INFO", msg))
-    def warning(self, msg): self.logs.append(("WARN", msg))
-    def error(self, msg): self.logs.append(("ERROR", msg))
-    def debug(self, msg): self.logs.append(("DEBUG", msg))
-
-
 ################### Test del Nodo MergeDataNode #####################
 
-def test_merge_data_node_inner_join():
+def test_merge_data_node_inner_join(mock_logger):
     df1 = pl.DataFrame({"id": [1, 2, 3], "val1": ["a", "b", "c"]})
     df2 = pl.DataFrame({"id": [2, 3, 4], "val2": ["x", "y", "z"]})
 
     node = MergeDataNode("merge_test", {"on_merge": "id", "how": "inner"})
-    node.logger = DummyLogger()
+    node.logger = mock_logger
 
     result = node.run({"data_1": df1, "data_2": df2})["data"]
 
@@ -36,7 +27,7 @@ def test_merge_data_node_inner_join():
 
 ################### Test del Nodo getHolidaysNode #####################
 
-def test_get_holidays_node_marks_festive_dates():
+def test_get_holidays_node_marks_festive_dates(mock_logger):
     df1 = pl.DataFrame({"fecha": ["2025-01-01", "2025-01-02", "2025-01-03"]})
     df2 = pl.DataFrame({"festivos": ["2025-01-01", "2025-01-06"]})
 
@@ -44,7 +35,7 @@ def test_get_holidays_node_marks_festive_dates():
         "list_col_dates": ["fecha"],
         "col_holidays": "festivos"
     })
-    node.logger = DummyLogger()
+    node.logger = mock_logger
 
     result = node.run({"data_1": df1, "data_2": df2})["data"]
 
@@ -54,7 +45,7 @@ def test_get_holidays_node_marks_festive_dates():
 
 ################### Test del Nodo clearMessagesNode #####################
 
-def test_clear_messages_node_filters_campaigns_and_clients():
+def test_clear_messages_node_filters_campaigns_and_clients(mock_logger):
     df1 = pl.DataFrame({
         "campaign_id": [1, 2, 3, 4],
         "client_id": [10, 20, 30, 40],
@@ -64,7 +55,7 @@ def test_clear_messages_node_filters_campaigns_and_clients():
     df3 = pl.DataFrame({"client_id": [10, 30]})
 
     node = clearMessagesNode("clear_test")
-    node.logger = DummyLogger()
+    node.logger = mock_logger
 
     result = node.run({"data_1": df1, "data_2": df2, "data_3": df3})["data"]
 
@@ -75,7 +66,7 @@ def test_clear_messages_node_filters_campaigns_and_clients():
 
 ################### Test del Nodo GetCampaignPerformanceNode #####################
 
-def test_get_campaign_performance_node_computes_metrics():
+def test_get_campaign_performance_node_computes_metrics(mock_logger):
     df = pl.DataFrame({
         "campaign_id": [1, 1, 2, 2, 2],
         "message_id": [11, 12, 21, 22, 23],
@@ -88,7 +79,7 @@ def test_get_campaign_performance_node_computes_metrics():
     })
 
     node = GetCampaignPerformanceNode("performance_test")
-    node.logger = DummyLogger()
+    node.logger = mock_logger
 
     result = node.run({"data": df})["data"]
 
@@ -7,17 +7,10 @@ from src.modulos.Utility_Module import (
     RenameColumnsNode,
     CastColumnsNode,
     DropColumnsNode,
+    CollectNode,
 )
 
 
-# Mock logger simple - Para no generar logs reales
-class DummyLogger:
-    def info(self, *args): pass
-    def debug(self, *args): pass
-    def warning(self, *args): pass
-    def error(self, *args): pass
-
-
 ############### test del nodo FilterNode ########################
 
 def test_filternode_basic_filter():
@@ -25,9 +18,9 @@ def test_filternode_basic_filter():
     config = {"condition": 'pl.col("edad") > 25'}
     node = FilterNode("FiltroEdad", config)
     result = node.run({"data": df})
-    assert "data" in result
-    assert result["data"].shape == (1, 2)
-    assert result["data"]["edad"][0] == 35
+    assert isinstance(result, pl.DataFrame)
+    assert result.shape == (1, 2)
+    assert result["edad"][0] == 35
 
 
 def test_filternode_missing_condition():
@@ -55,15 +48,15 @@ def test_dropduplicatenode_remove_dupes():
     df = pl.DataFrame({"a": [1, 1, 2], "b": [3, 3, 4]})
     node = DropDuplicateNode("DropDup", {"columnas": ["a"]})
     result = node.run({"data": df})
-    assert len(result["data"]) == 2
-    assert isinstance(result["data"], pl.DataFrame)
+    assert len(result) == 2
+    assert isinstance(result, pl.DataFrame)
 
 
 def test_dropduplicatenode_all_columns():
     df = pl.DataFrame({"a": [1, 1], "b": [2, 2]})
     node = DropDuplicateNode("DropDup", {})
     result = node.run({"data": df})
-    assert len(result["data"]) == 1
+    assert len(result) == 1
 
 
 def test_dropduplicatenode_invalid_type():
@@ -82,8 +75,8 @@ def test_dropnulltenode_drop_and_fillna():
     config = {"columnas": ["a"], "fillna": {"b": "default"}}
     node = DropNullteNode("DropNulos", config)
     result = node.run({"data": df})
-    assert result["data"]["b"].to_list() == ["x", "z"]
-    assert not result["data"]["a"].is_null().any()
+    assert result["b"].to_list() == ["x", "z"]
+    assert not result["a"].is_null().any()
 
 
 def test_dropnulltenode_drop_all_true():
@@ -93,8 +86,8 @@ def test_dropnulltenode_drop_all_true():
     })
     node = DropNullteNode("DropAll", {"drop_all": True})
     result = node.run({"data": df})
-    assert len(result["data"]) == 1
-    assert result["data"]["b"][0] == "ok"
+    assert len(result) == 1
+    assert result["b"][0] == "ok"
 
 
 def test_dropnulltenode_invalid_type():
@@ -109,7 +102,7 @@ def test_renamecolumnsnode_basic():
     df = pl.DataFrame({"old": [1, 2]})
     node = RenameColumnsNode("Renombrar", {"rename_map": {"old": "nuevo"}})
     result = node.run({"data": df})
-    assert "nuevo" in result["data"].columns
+    assert "nuevo" in result.columns
 
 
 def test_renamecolumnsnode_missing_config():
@@ -131,25 +124,25 @@ def test_castcolumnsnode_basic_types():
     config = {"cast_map": {"a": "int", "b": "bool"}}
     node = CastColumnsNode("Caster", config)
     result = node.run({"data": df})
-    df_out = result["data"]
+    df_out = result
     assert df_out["a"].dtype == pl.Int64
     assert df_out["b"].dtype == pl.Boolean
 
 
-def test_castcolumnsnode_unsupported_type():
+def test_castcolumnsnode_unsupported_type(mock_logger):
     df = pl.DataFrame({"a": ["x", "y"]})
     node = CastColumnsNode("Caster", {"cast_map": {"a": "unsupported"}})
-    node.logger = DummyLogger()
+    node.logger = mock_logger
     result = node.run({"data": df})
-    assert "a" in result["data"].columns
+    assert "a" in result.columns
 
 
-def test_castcolumnsnode_missing_column():
+def test_castcolumnsnode_missing_column(mock_logger):
     df = pl.DataFrame({"a": ["1"]})
     node = CastColumnsNode("Caster", {"cast_map": {"x": "int"}})
-    node.logger = DummyLogger()
+    node.logger = mock_logger
     result = node.run({"data": df})
-    assert "a" in result["data"].columns  # columna no eliminada
+    assert "a" in result.columns  # columna no eliminada
 
 
 ############### test del nodo DropColumnsNode ########################
@@ -158,18 +151,35 @@ def test_dropcolumnsnode_remove_columns():
     df = pl.DataFrame({"a": [1], "b": [2]})
     node = DropColumnsNode("DropCols", {"columnas": ["b"]})
     result = node.run({"data": df})
-    assert "b" not in result["data"].columns
+    assert "b" not in result.columns
 
 
-def test_dropcolumnsnode_no_columns_specified_logs_warning():
+def test_dropcolumnsnode_no_columns_specified_logs_warning(mock_logger):
     df = pl.DataFrame({"a": [1]})
     node = DropColumnsNode("DropCols", {})
-    node.logger = DummyLogger()
+    node.logger = mock_logger
     result = node.run({"data": df})
-    assert "a" in result["data"].columns
+    assert "a" in result.columns
 
 
 def test_dropcolumnsnode_invalid_type():
     node = DropColumnsNode("DropCols", {"columnas": ["a"]})
     with pytest.raises(TypeError):
         node.run({"data": "invalid"})
+
+
+############### test del nodo CollectNode ########################
+
+def test_collectnode_materializes_lazyframe():
+    lf = pl.DataFrame({"a": [1, 2, 3]}).lazy()
+    node = CollectNode("Collector", {})
+    result = node.run({"data": lf})
+    assert isinstance(result, pl.DataFrame)
+    assert result["a"].to_list() == [1, 2, 3]
+
+
+def test_collectnode_passthrough_dataframe():
+    df = pl.DataFrame({"a": [1]})
+    node = CollectNode("Collector", {})
+    result = node.run({"data": df})
+    assert result is df